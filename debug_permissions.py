@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
 import sys
-import configparser
+
 import mysql.connector
 
+from guacalib.debug import permission_report_lines
+from guacalib.repositories.base import CONNECT_OPTIONS, BaseGuacamoleRepository
+
 
 def main():
     if len(sys.argv) < 3:
@@ -20,28 +23,20 @@ def main():
     target = sys.argv[2]
     is_conngroup = len(sys.argv) >= 4 and sys.argv[3] == "--conngroup"
 
-    # Read config
-    config = configparser.ConfigParser()
-    config.read(config_file)
-
-    if "mysql" not in config:
-        print(f"Error: Missing [mysql] section in config file: {config_file}")
+    # Read config the same way guacaman does
+    try:
+        db_config = BaseGuacamoleRepository.read_config(config_file)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
-    db_config = {
-        "host": config["mysql"]["host"],
-        "user": config["mysql"]["user"],
-        "password": config["mysql"]["password"],
-        "database": config["mysql"]["database"],
-        # Use a more universally compatible collation
-        "charset": "utf8mb4",
-        "collation": "utf8mb4_general_ci",
-    }
-
     # Connect to DB
     try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(buffered=True)
+        # Results are streamed; discard any rows left after a fetchone()
+        conn = mysql.connector.connect(
+            **db_config, **CONNECT_OPTIONS, consume_results=True
+        )
+        cursor = conn.cursor()
 
         if is_conngroup:
             # Handle connection group
@@ -58,17 +53,6 @@ def main():
             target_id = result[0]
             print(f"Connection Group ID for '{target}': {target_id}")
 
-            # Check all permissions for connection group
-            cursor.execute(
-                """
-                SELECT cp.entity_id, e.name, e.type, cp.permission
-                FROM guacamole_connection_permission cp
-                JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-                WHERE cp.connection_id = %s
-            """,
-                (target_id,),
-            )
-
             target_type = "connection group"
 
         else:
@@ -86,68 +70,17 @@ def main():
             target_id = result[0]
             print(f"Connection ID for '{target}': {target_id}")
 
-            # Check all permissions for connection
-            cursor.execute(
-                """
-                SELECT cp.entity_id, e.name, e.type, cp.permission
-                FROM guacamole_connection_permission cp
-                JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-                WHERE cp.connection_id = %s
-            """,
-                (target_id,),
-            )
-
             target_type = "connection"
 
-        permissions = cursor.fetchall()
-        if not permissions:
-            print(f"No permissions found for {target_type} '{target}'")
-        else:
-            print(f"Found {len(permissions)} permissions:")
-            for perm in permissions:
-                entity_id, name, entity_type, permission = perm
-                print(
-                    f"  Entity ID: {entity_id}, Name: {name}, Type: {entity_type}, Permission: {permission}"
-                )
-
-        # Let's check for user permissions specifically
-        cursor.execute(
-            """
-            SELECT e.name
-            FROM guacamole_connection_permission cp
-            JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-            WHERE cp.connection_id = %s AND e.type = 'USER'
-        """,
-            (target_id,),
-        )
-
-        user_permissions = cursor.fetchall()
-        if not user_permissions:
-            print(f"No user permissions found for {target_type} '{target}'")
-        else:
-            print(f"Found {len(user_permissions)} user permissions:")
-            for perm in user_permissions:
-                print(f"  User: {perm[0]}")
-
-        # Also check for USER_GROUP permissions
-        cursor.execute(
-            """
-            SELECT e.name
-            FROM guacamole_connection_permission cp
-            JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-            WHERE cp.connection_id = %s AND e.type = 'USER_GROUP'
-        """,
-            (target_id,),
+        # Fetch all permissions once and bucket entity names by type
+        names_by_type = {}
+        sys.stdout.writelines(
+            f"{line}\n"
+            for line in permission_report_lines(
+                cursor, target_id, target_type, target, names_by_type
+            )
         )
 
-        group_permissions = cursor.fetchall()
-        if not group_permissions:
-            print(f"No user group permissions found for {target_type} '{target}'")
-        else:
-            print(f"Found {len(group_permissions)} user group permissions:")
-            for perm in group_permissions:
-                print(f"  Group: {perm[0]}")
-
         # If debugging a connection group, show additional information
         if is_conngroup:
             print(f"\nConnection Group Details:")
@@ -184,12 +117,13 @@ def main():
                 (target_id,),
             )
 
-            connections = cursor.fetchall()
-            if connections:
-                print(f"  Connections in group:")
-                for conn_name, protocol in connections:
-                    print(f"    - {conn_name} ({protocol})")
-            else:
+            has_connections = False
+            for conn_name, protocol in cursor:
+                if not has_connections:
+                    print(f"  Connections in group:")
+                    has_connections = True
+                print(f"    - {conn_name} ({protocol})")
+            if not has_connections:
                 print(f"  No direct connections in this group")
 
         # Only show connection details if not debugging connection group
@@ -204,16 +138,18 @@ def main():
                     c.connection_id,
                     c.connection_name,
                     c.protocol,
-                    (SELECT parameter_value FROM guacamole_connection_parameter
-                     WHERE connection_id = c.connection_id AND parameter_name = 'hostname' LIMIT 1) as hostname,
-                    (SELECT parameter_value FROM guacamole_connection_parameter
-                     WHERE connection_id = c.connection_id AND parameter_name = 'port' LIMIT 1) as port,
+                    MAX(CASE WHEN p.parameter_name = 'hostname' THEN p.parameter_value END) as hostname,
+                    MAX(CASE WHEN p.parameter_name = 'port' THEN p.parameter_value END) as port,
                     cg.connection_group_name as parent
                 FROM guacamole_connection c
+                LEFT JOIN guacamole_connection_parameter p
+                    ON p.connection_id = c.connection_id
+                    AND p.parameter_name IN ('hostname', 'port')
                 LEFT JOIN guacamole_connection_group cg ON c.parent_id = cg.connection_group_id
-                WHERE c.connection_name = %s
+                WHERE c.connection_id = %s
+                GROUP BY c.connection_id, c.connection_name, c.protocol, cg.connection_group_name
             """,
-                (target,),
+                (target_id,),
             )
 
         if not is_conngroup:
@@ -228,32 +164,11 @@ def main():
                 print(f"  Port: {port}")
                 print(f"  Parent: {parent}")
 
-                # Get groups separately
-                cursor.execute(
-                    """
-                    SELECT e.name
-                    FROM guacamole_connection_permission cp
-                    JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-                    WHERE cp.connection_id = %s AND e.type = 'USER_GROUP'
-                """,
-                    (conn_id,),
-                )
-
-                groups = [row[0] for row in cursor.fetchall()]
+                # Groups and users come from the permissions fetched above
+                groups = names_by_type.get("USER_GROUP", [])
                 print(f"  Groups: {', '.join(groups) if groups else 'None'}")
 
-                # Get user permissions separately
-                cursor.execute(
-                    """
-                    SELECT e.name
-                    FROM guacamole_connection_permission cp
-                    JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-                    WHERE cp.connection_id = %s AND e.type = 'USER'
-                """,
-                    (conn_id,),
-                )
-
-                users = [row[0] for row in cursor.fetchall()]
+                users = names_by_type.get("USER", [])
                 print(f"  User Permissions: {', '.join(users) if users else 'None'}")
             else:
                 print(f"Connection '{target}' not found in basic query")
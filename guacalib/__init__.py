@@ -1,7 +1,7 @@
-from .db import GuacamoleDB
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from .version import VERSION
-from .repositories.connection_parameters import CONNECTION_PARAMETERS
-from .repositories.user_parameters import USER_PARAMETERS
 from .exceptions import (
     GuacalibError,
     DatabaseError,
@@ -23,3 +23,33 @@ __all__ = [
     "PermissionError",
     "ConfigurationError",
 ]
+
+# Public names loaded on first access, mapped to the module defining them.
+# Anything under guacalib.db or guacalib.repositories pulls in
+# mysql-connector, which dominates import time; deferring it lets code
+# that only needs the exceptions, such as the CLI's argument handling,
+# skip that cost.
+_LAZY_ATTRIBUTES = {
+    "GuacamoleDB": ".db",
+    "CONNECTION_PARAMETERS": ".repositories.connection_parameters",
+    "USER_PARAMETERS": ".repositories.user_parameters",
+}
+
+if TYPE_CHECKING:
+    from .db import GuacamoleDB
+    from .repositories.connection_parameters import CONNECTION_PARAMETERS
+    from .repositories.user_parameters import USER_PARAMETERS
+
+
+def __getattr__(name: str) -> Any:
+    """Import lazily loaded public names on first access"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,10 +1,14 @@
+import functools
 import sys
 from argparse import Namespace
-from typing import NoReturn
+from typing import TYPE_CHECKING, Dict, List, NoReturn
 
-from guacalib import GuacamoleDB
-from guacalib.exceptions import GuacalibError
-from .validators import validate_port, validate_selector
+from guacalib.exceptions import EntityNotFoundError, GuacalibError
+from .output import format_connections, write_lines
+from .validators import parse_name_list, validate_port, validate_selector
+
+if TYPE_CHECKING:
+    from guacalib import GuacamoleDB
 
 
 def is_terminal() -> bool:
@@ -12,16 +16,22 @@ def is_terminal() -> bool:
     return sys.stdout.isatty()
 
 
-# Initialize colors based on terminal
+# Initialize colors based on terminal, checked once at import
 if is_terminal():
     VAR_COLOR = "\033[1;36m"  # Bright cyan
     RESET = "\033[0m"  # Reset color
+    PARAM_FORMAT = (
+        "  \033[1;36m{param}\033[0m: {description} (type: {type}, default: {default})"
+    )
+    REF_FORMAT = "\n    Reference: \033[4m{}\033[0m"  # Underlined
 else:
     VAR_COLOR = ""
     RESET = ""
+    PARAM_FORMAT = "  {param}: {description} (type: {type}, default: {default})"
+    REF_FORMAT = "\n    Reference: {}"
 
 
-def handle_conn_command(args: Namespace, guacdb: GuacamoleDB) -> None:
+def handle_conn_command(args: Namespace, guacdb: "GuacamoleDB") -> None:
     command_handlers = {
         "new": handle_conn_new,
         "list": handle_conn_list,
@@ -38,86 +48,63 @@ def handle_conn_command(args: Namespace, guacdb: GuacamoleDB) -> None:
         sys.exit(1)
 
 
-def handle_conn_list(args: Namespace, guacdb: GuacamoleDB) -> None:
+def handle_conn_list(args: Namespace, guacdb: "GuacamoleDB") -> None:
     # Check if specific ID is requested
-    if hasattr(args, "id") and args.id:
+    conn_id = getattr(args, "id", None)
+    if conn_id:
         # Get specific connection by ID
-        connection = guacdb.get_connection_by_id(args.id)
+        connection = guacdb.get_connection_by_id(conn_id)
         if not connection:
-            print(f"Connection with ID {args.id} not found")
+            print(f"Connection with ID {conn_id} not found")
             sys.exit(1)
         connections = [connection]
     else:
         # Get all connections
         connections = guacdb.list_connections_with_conngroups_and_parents()
 
-    print("connections:")
-    for conn in connections:
-        # Unpack connection info (now includes connection_id)
-        conn_id, name, protocol, host, port, groups, parent, user_permissions = conn
-
-        print(f"  {name}:")
-        print(f"    id: {conn_id}")
-        print(f"    type: {protocol}")
-        print(f"    hostname: {host}")
-        print(f"    port: {port}")
-        if parent:
-            print(f"    parent: {parent}")
-        print("    groups:")
-        for group in groups.split(",") if groups else []:
-            if group:  # Skip empty group names
-                print(f"      - {group}")
-
-        # Add this section to show individual user permissions
-        if user_permissions:
-            print("    permissions:")
-            for user in user_permissions:
-                print(f"      - {user}")
-
-
-def handle_conn_new(args: Namespace, guacdb: GuacamoleDB) -> None:
+    write_lines(format_connections(connections))
+
+
+def handle_conn_new(args: Namespace, guacdb: "GuacamoleDB") -> None:
     # Validate port before creating connection
-    validate_port(args.port)
+    port = validate_port(args.port)
 
     try:
         connection_id = None
 
         connection_id = guacdb.create_connection(
-            args.type, args.name, args.hostname, args.port, args.password
+            args.type, args.name, args.hostname, port, args.password
         )
         guacdb.debug_print(f"Successfully created connection '{args.name}'")
 
         if connection_id and args.usergroup:
-            groups = [g.strip() for g in args.usergroup.split(",")]
-            success = True
-
-            for group in groups:
-                try:
-                    guacdb.grant_connection_permission(
-                        group,  # Direct group name
-                        "USER_GROUP",
-                        connection_id,
-                        group_path=None,  # No path nesting
-                    )
-                    guacdb.debug_print(f"Granted access to group '{group}'")
-                except GuacalibError as e:
-                    print(f"[-] Failed to grant access to group '{group}': {e}")
-                    success = False
+            groups = parse_name_list(args.usergroup)
+
+            missing = guacdb.grant_connection_permissions(
+                groups, "USER_GROUP", connection_id
+            )
+            for group in missing:
+                error = EntityNotFoundError("usergroup", group)
+                print(f"[-] Failed to grant access to group '{group}': {error}")
 
-            if not success:
-                raise RuntimeError("Failed to grant access to one or more groups")
+            if missing:
+                # Non-zero exit rolls back the new connection as well
+                print("Error: Failed to grant access to one or more groups")
+                sys.exit(1)
+            guacdb.debug_print(f"Granted access to groups: {', '.join(groups)}")
 
     except GuacalibError as e:
         print(f"Error creating connection: {e}")
         sys.exit(1)
 
 
-def handle_conn_delete(args: Namespace, guacdb: GuacamoleDB) -> None:
+def handle_conn_delete(args: Namespace, guacdb: "GuacamoleDB") -> None:
     validate_selector(args, "connection")
+    conn_id = getattr(args, "id", None)
 
     try:
-        if hasattr(args, "id") and args.id is not None:
-            guacdb.delete_existing_connection(connection_id=args.id)
+        if conn_id is not None:
+            guacdb.delete_existing_connection(connection_id=conn_id)
         else:
             guacdb.delete_existing_connection(connection_name=args.name)
     except GuacalibError as e:
@@ -125,12 +112,13 @@ def handle_conn_delete(args: Namespace, guacdb: GuacamoleDB) -> None:
         sys.exit(1)
 
 
-def handle_conn_exists(args: Namespace, guacdb: GuacamoleDB) -> NoReturn:
+def handle_conn_exists(args: Namespace, guacdb: "GuacamoleDB") -> NoReturn:
     validate_selector(args, "connection")
+    conn_id = getattr(args, "id", None)
 
     try:
-        if hasattr(args, "id") and args.id is not None:
-            if guacdb.connection_exists(connection_id=args.id):
+        if conn_id is not None:
+            if guacdb.connection_exists(connection_id=conn_id):
                 sys.exit(0)
             else:
                 sys.exit(1)
@@ -144,52 +132,57 @@ def handle_conn_exists(args: Namespace, guacdb: GuacamoleDB) -> NoReturn:
         sys.exit(1)
 
 
-def handle_conn_modify(args: Namespace, guacdb: GuacamoleDB) -> None:
+@functools.lru_cache(maxsize=None)
+def conn_modify_help() -> str:
+    """Return the usage text of conn modify, built once per process"""
+    from guacalib import CONNECTION_PARAMETERS
+
+    # One sorted pass, split by the table each parameter is stored in
+    params_by_table: Dict[str, List[str]] = {"connection": [], "parameter": []}
+    for param, info in sorted(CONNECTION_PARAMETERS.items()):
+        desc = PARAM_FORMAT.format(
+            param=param,
+            description=info["description"],
+            type=info["type"],
+            default=info["default"],
+        )
+        if "ref" in info:
+            desc += REF_FORMAT.format(info["ref"])
+        params_by_table[info["table"]].append(desc)
+
+    lines = [
+        "Usage: guacaman conn modify {--name <connection_name> | --id <connection_id>} [--set <param=value> ...] [--parent CONNGROUP] [--permit USERNAME] [--deny USERNAME]",
+        "",
+        "Modification options:",
+        f"  {VAR_COLOR}--set{RESET}: Modify connection parameters",
+        f"  {VAR_COLOR}--parent{RESET}: Set parent connection group (use empty string to remove group)",
+        "",
+        "Modifiable connection parameters:",
+        *params_by_table["connection"],
+        "",
+        "Parameters in guacamole_connection_parameter table:",
+        *params_by_table["parameter"],
+    ]
+    return "".join(f"{line}\n" for line in lines)
+
+
+def handle_conn_modify(args: Namespace, guacdb: "GuacamoleDB") -> None:
     """Handle the connection modify command"""
     # Check if no modification options provided - show help
     if not args.set and args.parent is None and not args.permit and not args.deny:
-        # Print help information about modifiable parameters
-        print(
-            "Usage: guacaman conn modify {--name <connection_name> | --id <connection_id>} [--set <param=value> ...] [--parent CONNGROUP] [--permit USERNAME] [--deny USERNAME]"
-        )
-        print("\nModification options:")
-        print(f"  {VAR_COLOR}--set{RESET}: Modify connection parameters")
-        print(
-            f"  {VAR_COLOR}--parent{RESET}: Set parent connection group (use empty string to remove group)"
-        )
-        print("\nModifiable connection parameters:")
-        for param, info in sorted(guacdb.CONNECTION_PARAMETERS.items()):
-            if info["table"] == "connection":
-                desc = f"  {VAR_COLOR}{param}{RESET}: {info['description']} (type: {info['type']}, default: {info['default']})"
-                if "ref" in info:
-                    if is_terminal():
-                        desc += f"\n    Reference: \033[4m{info['ref']}\033[0m"
-                    else:
-                        desc += f"\n    Reference: {info['ref']}"
-                print(desc)
-
-        print("\nParameters in guacamole_connection_parameter table:")
-        for param, info in sorted(guacdb.CONNECTION_PARAMETERS.items()):
-            if info["table"] == "parameter":
-                desc = f"  {VAR_COLOR}{param}{RESET}: {info['description']} (type: {info['type']}, default: {info['default']})"
-                if "ref" in info:
-                    if is_terminal():
-                        desc += f"\n    Reference: \033[4m{info['ref']}\033[0m"
-                    else:
-                        desc += f"\n    Reference: {info['ref']}"
-                print(desc)
-
+        sys.stdout.write(conn_modify_help())
         sys.exit(1)
 
     validate_selector(args, "connection")
+    conn_id = getattr(args, "id", None)
 
     try:
         # Get connection name for display purposes (resolvers handle the actual lookup)
-        if hasattr(args, "id") and args.id is not None:
+        if conn_id is not None:
             # For ID-based operations, get name for display
-            connection_name = guacdb.get_connection_name_by_id(args.id)
+            connection_name = guacdb.get_connection_name_by_id(conn_id)
             if not connection_name:
-                print(f"Error: Connection with ID {args.id} not found")
+                print(f"Error: Connection with ID {conn_id} not found")
                 sys.exit(1)
         else:
             connection_name = args.name
@@ -214,9 +207,9 @@ def handle_conn_modify(args: Namespace, guacdb: GuacamoleDB) -> None:
         if args.parent is not None:
             # Convert empty string to None to unset parent group
             parent_group = args.parent if args.parent != "" else None
-            if hasattr(args, "id") and args.id is not None:
+            if conn_id is not None:
                 guacdb.modify_connection_parent_group(
-                    connection_id=args.id, group_name=parent_group
+                    connection_id=conn_id, group_name=parent_group
                 )
             else:
                 guacdb.modify_connection_parent_group(
@@ -228,21 +221,21 @@ def handle_conn_modify(args: Namespace, guacdb: GuacamoleDB) -> None:
 
         # Process each --set argument (if any) using resolver
         for param_value in args.set or []:
-            if "=" not in param_value:
+            param, sep, value = param_value.partition("=")
+            if not sep:
                 print(
                     f"Error: Invalid format for --set. Must be param=value, got: {param_value}"
                 )
                 sys.exit(1)
 
-            param, value = param_value.split("=", 1)
             guacdb.debug_print(
                 f"Modifying connection '{connection_name}': setting {param}={value}"
             )
 
             try:
-                if hasattr(args, "id") and args.id is not None:
+                if conn_id is not None:
                     guacdb.modify_connection(
-                        connection_id=args.id, param_name=param, param_value=value
+                        connection_id=conn_id, param_name=param, param_value=value
                     )
                 else:
                     guacdb.modify_connection(
@@ -1,10 +1,15 @@
+import functools
 import re
 import sys
 from argparse import Namespace
-from typing import NoReturn
+from typing import TYPE_CHECKING, NoReturn
 
-from guacalib import GuacamoleDB
-from guacalib.exceptions import GuacalibError
+from guacalib.exceptions import EntityNotFoundError, GuacalibError
+from .output import format_users, write_lines
+from .validators import parse_name_list
+
+if TYPE_CHECKING:
+    from guacalib import GuacamoleDB
 
 # Guacamole entity name constraints (from schema: varchar(128) NOT NULL)
 USERNAME_MAX_LENGTH = 128
@@ -43,7 +48,7 @@ def validate_username(username: str) -> None:
         sys.exit(1)
 
 
-def handle_user_command(args: Namespace, guacdb: GuacamoleDB) -> None:
+def handle_user_command(args: Namespace, guacdb: "GuacamoleDB") -> None:
     command_handlers = {
         "new": handle_user_new,
         "list": handle_user_list,
@@ -60,47 +65,34 @@ def handle_user_command(args: Namespace, guacdb: GuacamoleDB) -> None:
         sys.exit(1)
 
 
-def handle_user_new(args: Namespace, guacdb: GuacamoleDB) -> None:
+def handle_user_new(args: Namespace, guacdb: "GuacamoleDB") -> None:
     validate_username(args.name)
 
-    if guacdb.user_exists(args.name):
-        print(f"Error: User '{args.name}' already exists")
-        sys.exit(1)
-
-    guacdb.create_user(args.name, args.password)
-    groups = []
-
-    if args.usergroup:
-        groups = [g.strip() for g in args.usergroup.split(",")]
-        success = True
+    # create_user raises ValidationError if the user already exists
+    entity_id = guacdb.create_user(args.name, args.password)
+    groups = parse_name_list(args.usergroup) if args.usergroup else []
 
-        for group in groups:
-            try:
-                guacdb.add_user_to_usergroup(args.name, group)
-                guacdb.debug_print(f"Added user '{args.name}' to usergroup '{group}'")
-            except GuacalibError as e:
-                print(f"[-] Failed to add to group '{group}': {e}")
-                success = False
-
-        if not success:
-            raise RuntimeError("Failed to add to one or more groups")
+    if groups:
+        missing = guacdb.add_user_to_usergroups_by_entity_id(entity_id, groups)
+        for group in missing:
+            error = EntityNotFoundError("usergroup", group)
+            print(f"[-] Failed to add to group '{group}': {error}")
+
+        if missing:
+            # Non-zero exit rolls back the new user as well
+            print("Error: Failed to add to one or more groups")
+            sys.exit(1)
 
     guacdb.debug_print(f"Successfully created user '{args.name}'")
     if groups:
         guacdb.debug_print(f"Group memberships: {', '.join(groups)}")
 
 
-def handle_user_list(args: Namespace, guacdb: GuacamoleDB) -> None:
-    users_and_groups = guacdb.list_users_with_usergroups()
-    print("users:")
-    for user, groups in users_and_groups.items():
-        print(f"  {user}:")
-        print("    usergroups:")
-        for group in groups:
-            print(f"      - {group}")
+def handle_user_list(args: Namespace, guacdb: "GuacamoleDB") -> None:
+    write_lines(format_users(guacdb.list_users_with_usergroups()))
 
 
-def handle_user_delete(args: Namespace, guacdb: GuacamoleDB) -> None:
+def handle_user_delete(args: Namespace, guacdb: "GuacamoleDB") -> None:
     validate_username(args.name)
 
     try:
@@ -111,7 +103,7 @@ def handle_user_delete(args: Namespace, guacdb: GuacamoleDB) -> None:
         sys.exit(1)
 
 
-def handle_user_exists(args: Namespace, guacdb: GuacamoleDB) -> NoReturn:
+def handle_user_exists(args: Namespace, guacdb: "GuacamoleDB") -> NoReturn:
     validate_username(args.name)
 
     if guacdb.user_exists(args.name):
@@ -120,34 +112,39 @@ def handle_user_exists(args: Namespace, guacdb: GuacamoleDB) -> NoReturn:
         sys.exit(1)
 
 
-def handle_user_modify(args: Namespace, guacdb: GuacamoleDB) -> None:
-    # Show usage if no arguments provided
-    if not args.name or (not args.set and not args.password):
-        print(
-            "Usage: guacaman user modify --name USERNAME [--set PARAMETER=VALUE] [--password NEW_PASSWORD]"
-        )
-        print("\nAllowed parameters:")
-        print("-------------------")
-        max_param_len = max(len(param) for param in guacdb.USER_PARAMETERS.keys())
-        max_type_len = max(
-            len(info["type"]) for info in guacdb.USER_PARAMETERS.values()
-        )
-
-        print(
-            f"{'PARAMETER':<{max_param_len+2}} {'TYPE':<{max_type_len+2}} {'DEFAULT':<10} DESCRIPTION"
+@functools.lru_cache(maxsize=None)
+def user_modify_help() -> str:
+    """Return the usage text of user modify, built once per process"""
+    from guacalib import USER_PARAMETERS
+
+    max_param_len = max(len(param) for param in USER_PARAMETERS.keys())
+    max_type_len = max(len(info["type"]) for info in USER_PARAMETERS.values())
+
+    lines = [
+        "Usage: guacaman user modify --name USERNAME [--set PARAMETER=VALUE] [--password NEW_PASSWORD]",
+        "",
+        "Allowed parameters:",
+        "-------------------",
+        f"{'PARAMETER':<{max_param_len+2}} {'TYPE':<{max_type_len+2}} {'DEFAULT':<10} DESCRIPTION",
+        f"{'-'*(max_param_len+2)} {'-'*(max_type_len+2)} {'-'*10} {'-'*40}",
+    ]
+    for param, info in sorted(USER_PARAMETERS.items()):
+        lines.append(
+            f"{param:<{max_param_len+2}} {info['type']:<{max_type_len+2}} {info['default']:<10} {info['description']}"
         )
-        print(f"{'-'*(max_param_len+2)} {'-'*(max_type_len+2)} {'-'*10} {'-'*40}")
+    lines += [
+        "",
+        "Example usage:",
+        "  guacaman user modify --name john.doe --set disabled=1",
+        '  guacaman user modify --name john.doe --set "organization=Example Corp"',
+    ]
+    return "".join(f"{line}\n" for line in lines)
 
-        for param, info in sorted(guacdb.USER_PARAMETERS.items()):
-            print(
-                f"{param:<{max_param_len+2}} {info['type']:<{max_type_len+2}} {info['default']:<10} {info['description']}"
-            )
 
-        print("\nExample usage:")
-        print("  guacaman user modify --name john.doe --set disabled=1")
-        print(
-            '  guacaman user modify --name john.doe --set "organization=Example Corp"'
-        )
+def handle_user_modify(args: Namespace, guacdb: "GuacamoleDB") -> None:
+    # Show usage if no arguments provided
+    if not args.name or (not args.set and not args.password):
+        sys.stdout.write(user_modify_help())
         sys.exit(0)
 
     validate_username(args.name)
@@ -0,0 +1,12 @@
+from argparse import Namespace
+from typing import TYPE_CHECKING, Optional
+
+from guacalib.version import VERSION
+
+if TYPE_CHECKING:
+    from guacalib import GuacamoleDB
+
+
+def handle_version_command(args: Namespace, guacdb: Optional["GuacamoleDB"]) -> None:
+    """Print the version; guacdb is None when run outside a batch"""
+    print(f"guacaman version {VERSION}")
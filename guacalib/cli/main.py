@@ -1,18 +1,19 @@
 #!/usr/bin/env python3
 
 import argparse
+import contextlib
+import importlib
 import os
+import shlex
 import sys
 from argparse import Namespace
-from typing import NoReturn
+from typing import TYPE_CHECKING, Callable, Dict, List, NoReturn, Optional, Tuple
 
-from guacalib import GuacamoleDB
 from guacalib.exceptions import GuacalibError
-from guacalib.cli.handle_usergroup import handle_usergroup_command
-from guacalib.cli.handle_dump import handle_dump_command
-from guacalib.cli.handle_user import handle_user_command
-from guacalib.cli.handle_conn import handle_conn_command
-from guacalib.cli.handle_conngroup import handle_conngroup_command
+from guacalib.version import VERSION
+
+if TYPE_CHECKING:
+    from guacalib import GuacamoleDB
 
 
 def positive_int(value: str) -> int:
@@ -211,6 +212,18 @@ def setup_version_subcommand(subparsers: argparse._SubParsersAction) -> None:
     subparsers.add_parser("version", help="Show version information")
 
 
+def setup_batch_subcommand(subparsers: argparse._SubParsersAction) -> None:
+    batch_parser = subparsers.add_parser(
+        "batch", help="Run guacaman commands from a file in a single transaction"
+    )
+    batch_parser.add_argument(
+        "--file",
+        required=True,
+        help="File with one guacaman command per line, without global options "
+        "('-' reads standard input)",
+    )
+
+
 def setup_conn_subcommands(subparsers: argparse._SubParsersAction) -> None:
     conn_parser = subparsers.add_parser("conn", help="Manage connections")
     conn_subparsers = conn_parser.add_subparsers(
@@ -282,7 +295,39 @@ def setup_conn_subcommands(subparsers: argparse._SubParsersAction) -> None:
     )
 
 
-def main() -> NoReturn:
+# Subcommand parser setup functions, in the order they appear in --help
+SUBCOMMAND_SETUP = {
+    "user": setup_user_subcommands,
+    "usergroup": setup_usergroup_subcommands,
+    "conn": setup_conn_subcommands,
+    "dump": setup_dump_subcommand,
+    "version": setup_version_subcommand,
+    "conngroup": setup_conngroup_subcommands,
+    "batch": setup_batch_subcommand,
+}
+
+
+def find_command(argv: List[str]) -> Optional[str]:
+    """Return the first positional argument, skipping global options"""
+    arguments = iter(argv)
+    for arg in arguments:
+        if arg == "--config":
+            next(arguments, None)
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def build_parser(
+    command: Optional[str] = None,
+) -> Tuple[argparse.ArgumentParser, argparse._SubParsersAction]:
+    """Build the argument parser.
+
+    Only the subcommand tree for ``command`` is built when it names a known
+    command, since a single invocation never needs the others. Without a
+    recognizable command, and for batch files which may contain any
+    command, all subcommands are built so help and error output list them.
+    """
     parser = argparse.ArgumentParser(
         description="Manage Guacamole users, groups, and connections"
     )
@@ -292,23 +337,153 @@ def main() -> NoReturn:
         help="Path to database config file (default: ~/.guacaman.ini)",
     )
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
+    parser.add_argument(
+        "--version", action="version", version=f"guacaman version {VERSION}"
+    )
     subparsers = parser.add_subparsers(dest="command", help="Commands")
 
-    setup_user_subcommands(subparsers)
-    setup_usergroup_subcommands(subparsers)
-    setup_conn_subcommands(subparsers)
-    setup_dump_subcommand(subparsers)
-    setup_version_subcommand(subparsers)
-    setup_conngroup_subcommands(subparsers)
+    if command in SUBCOMMAND_SETUP and command != "batch":
+        SUBCOMMAND_SETUP[command](subparsers)
+    else:
+        for setup in SUBCOMMAND_SETUP.values():
+            setup(subparsers)
+
+    return parser, subparsers
+
+
+# Parsers built so far in this process, keyed by the command they cover
+_parsers: Dict[
+    Optional[str], Tuple[argparse.ArgumentParser, argparse._SubParsersAction]
+] = {}
+
+
+def get_parser(
+    command: Optional[str] = None,
+) -> Tuple[argparse.ArgumentParser, argparse._SubParsersAction]:
+    """Return the argument parser for ``command``, building it only once.
+
+    Parsing does not modify a parser, so callers that run main() many
+    times in one process, such as test harnesses, reuse the same parser.
+    """
+    if command not in SUBCOMMAND_SETUP or command == "batch":
+        # build_parser builds the full tree for all of these
+        command = None
+    if command not in _parsers:
+        _parsers[command] = build_parser(command)
+    return _parsers[command]
+
+
+# Handlers of the commands that run against the database, as (module,
+# function) names. A handler module is imported only when its command runs,
+# so an invocation loads just the one it needs.
+COMMAND_HANDLERS = {
+    "user": ("guacalib.cli.handle_user", "handle_user_command"),
+    "usergroup": ("guacalib.cli.handle_usergroup", "handle_usergroup_command"),
+    "conn": ("guacalib.cli.handle_conn", "handle_conn_command"),
+    "conngroup": ("guacalib.cli.handle_conngroup", "handle_conngroup_command"),
+    "dump": ("guacalib.cli.handle_dump", "handle_dump_command"),
+    "version": ("guacalib.cli.handle_version", "handle_version_command"),
+}
+
+
+def get_handler(command: str) -> Callable[[Namespace, "GuacamoleDB"], None]:
+    """Import and return the handler function of a command"""
+    module_name, function_name = COMMAND_HANDLERS[command]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# Commands answered without reading the config file or connecting
+LOCAL_COMMANDS = {"version"}
+
+# Commands that require a subcommand, mapped to the attribute holding it
+SUBCOMMAND_DESTS = {
+    "user": "user_command",
+    "usergroup": "usergroup_command",
+    "conn": "conn_command",
+    "conngroup": "conngroup_command",
+}
+
+
+def check_subcommand(args: Namespace, subparsers: argparse._SubParsersAction) -> None:
+    """Print command help and exit if a command was given without a subcommand"""
+    dest = SUBCOMMAND_DESTS.get(args.command)
+    if dest and not getattr(args, dest):
+        subparsers.choices[args.command].print_help()
+        sys.exit(1)
+
+
+def run_command(args: Namespace, guacdb: Optional["GuacamoleDB"]) -> None:
+    """Dispatch a parsed command to its handler"""
+    get_handler(args.command)(args, guacdb)
+
+
+def handle_batch_command(
+    args: Namespace,
+    guacdb: "GuacamoleDB",
+    parser: argparse.ArgumentParser,
+    subparsers: argparse._SubParsersAction,
+) -> None:
+    """Run commands from a batch file on one database connection.
+
+    Every non-empty line that does not start with '#' is parsed like the
+    guacaman command line. A file name of '-' reads standard input. All
+    commands share one transaction, so the batch stops at the first failing
+    command and none of its changes are committed.
+    """
+    if args.file == "-":
+        # Not closed afterwards, unlike a file we opened
+        batch_file = contextlib.nullcontext(sys.stdin)
+    else:
+        try:
+            batch_file = open(args.file, encoding="utf-8")
+        except OSError as e:
+            print(f"Error: Cannot read batch file {args.file}: {e.strerror}")
+            sys.exit(1)
+
+    with batch_file as lines:
+        for lineno, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            try:
+                line_args = parser.parse_args(shlex.split(line))
+                if line_args.command == "batch":
+                    print("Error: Nested batch commands are not supported")
+                    sys.exit(1)
+                check_subcommand(line_args, subparsers)
+                run_command(line_args, guacdb)
+            except SystemExit as e:
+                # Handlers exit with 0 on success, e.g. after 'exists'
+                if e.code not in (0, None):
+                    print(f"Error: Batch stopped at line {lineno}: {line}")
+                    sys.exit(1)
+            except ValueError as e:
+                # Unbalanced quotes from shlex
+                print(f"Error: line {lineno}: {e}")
+                sys.exit(1)
+            except GuacalibError as e:
+                print(f"Error: line {lineno}: {e}")
+                sys.exit(1)
+
 
+def main() -> NoReturn:
+    parser, subparsers = get_parser(find_command(sys.argv[1:]))
     args = parser.parse_args()
 
+    if args.command in LOCAL_COMMANDS:
+        run_command(args, None)
+        sys.exit(0)
+
     def check_config_permissions(config_path):
         """Check config file has secure permissions"""
-        if not os.path.exists(config_path):
+        # A single stat call, with no gap between an existence check and
+        # reading the mode
+        try:
+            mode = os.stat(config_path).st_mode
+        except OSError:
             return  # Will be handled later by GuacamoleDB
 
-        mode = os.stat(config_path).st_mode
         if mode & 0o077:  # Check if group/others have any permissions
             print(f"ERROR: Config file {config_path} has insecure permissions!")
             print("Required permissions: -rw------- (600)")
@@ -322,41 +497,21 @@ def main() -> NoReturn:
         parser.print_help()
         sys.exit(1)
 
-    if args.command == "user" and not args.user_command:
-        subparsers.choices["user"].print_help()
-        sys.exit(1)
-
-    if args.command == "usergroup" and not args.usergroup_command:
-        subparsers.choices["usergroup"].print_help()
-        sys.exit(1)
-    if args.command == "conn" and not args.conn_command:
-        subparsers.choices["conn"].print_help()
-        sys.exit(1)
+    check_subcommand(args, subparsers)
 
     try:
-        with GuacamoleDB(args.config, debug=args.debug) as guacdb:
-            if args.command == "user":
-                handle_user_command(args, guacdb)
-
-            elif args.command == "usergroup":
-                handle_usergroup_command(args, guacdb)
-
-            elif args.command == "dump":
-                handle_dump_command(guacdb)
-
-            elif args.command == "version":
-                from guacalib import VERSION
-
-                print(f"guacaman version {VERSION}")
-
-            elif args.command == "conn":
-                handle_conn_command(args, guacdb)
-
-            elif args.command == "conngroup":
-                if not args.conngroup_command:
-                    subparsers.choices["conngroup"].print_help()
-                    sys.exit(1)
-                handle_conngroup_command(args, guacdb)
+        # Imported here so that help and argument errors exit without
+        # loading the database layer
+        from guacalib import GuacamoleDB
+
+        # A batch repeats the same few queries many times on one
+        # connection, so each is prepared on the server once
+        prepared = args.command == "batch"
+        with GuacamoleDB(args.config, debug=args.debug, prepared=prepared) as guacdb:
+            if args.command == "batch":
+                handle_batch_command(args, guacdb, parser, subparsers)
+            else:
+                run_command(args, guacdb)
 
     except GuacalibError as e:
         print(f"Error: {e}")
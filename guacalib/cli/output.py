@@ -0,0 +1,110 @@
+"""CLI output utilities."""
+
+import sys
+from typing import Any, Dict, Iterable, List, Sequence
+
+
+def write_lines(lines: Iterable[str]) -> None:
+    """Write lines to stdout with a single write call.
+
+    List output can run to thousands of lines; joining them first avoids a
+    separate write per print() on line-buffered terminals.
+
+    Args:
+        lines: Output lines without trailing newlines
+    """
+    sys.stdout.write("".join(f"{line}\n" for line in lines))
+
+
+def format_users(users_and_groups: Dict[str, List[str]]) -> List[str]:
+    """Format the ``users:`` section of list and dump output.
+
+    Args:
+        users_and_groups: Group names per username
+
+    Returns:
+        list: Output lines
+    """
+    lines = ["users:"]
+    for user, groups in users_and_groups.items():
+        lines.append(f"  {user}:")
+        lines.append("    usergroups:")
+        lines.extend(f"      - {group}" for group in groups)
+    return lines
+
+
+def format_usergroups(
+    groups_data: Dict[str, Dict[str, Any]], with_ids: bool = True
+) -> List[str]:
+    """Format the ``usergroups:`` section of list and dump output.
+
+    Args:
+        groups_data: Group details per group name, with ``id``, ``users``
+            and ``connections`` keys
+        with_ids: Include each group's ID, as usergroup list does
+
+    Returns:
+        list: Output lines
+    """
+    lines = ["usergroups:"]
+    for group, data in groups_data.items():
+        lines.append(f"  {group}:")
+        if with_ids:
+            lines.append(f"    id: {data['id']}")
+        lines.append("    users:")
+        lines.extend(f"      - {user}" for user in data["users"])
+        lines.append("    connections:")
+        lines.extend(f"      - {conn}" for conn in data["connections"])
+    return lines
+
+
+def format_connections(connections: Iterable[Sequence[Any]]) -> List[str]:
+    """Format the ``connections:`` section of list and dump output.
+
+    Args:
+        connections: Rows as returned by
+            list_connections_with_conngroups_and_parents()
+
+    Returns:
+        list: Output lines
+    """
+    lines = ["connections:"]
+    for conn in connections:
+        conn_id, name, protocol, host, port, groups, parent, user_permissions = conn
+        lines.append(f"  {name}:")
+        lines.append(f"    id: {conn_id}")
+        lines.append(f"    type: {protocol}")
+        lines.append(f"    hostname: {host}")
+        lines.append(f"    port: {port}")
+        if parent:
+            lines.append(f"    parent: {parent}")
+        lines.append("    groups:")
+        if groups:
+            # Skip empty group names
+            lines.extend(
+                f"      - {group}" for group in filter(None, groups.split(","))
+            )
+        if user_permissions:
+            lines.append("    permissions:")
+            lines.extend(f"      - {user}" for user in user_permissions)
+    return lines
+
+
+def format_conngroups(groups: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Format the ``conngroups:`` section of list and dump output.
+
+    Args:
+        groups: Group details per connection group name, with ``id``,
+            ``parent`` and ``connections`` keys
+
+    Returns:
+        list: Output lines
+    """
+    lines = ["conngroups:"]
+    for group_name, data in groups.items():
+        lines.append(f"  {group_name}:")
+        lines.append(f"    id: {data['id']}")
+        lines.append(f"    parent: {data['parent']}")
+        lines.append("    connections:")
+        lines.extend(f"      - {conn}" for conn in data["connections"])
+    return lines
@@ -2,7 +2,7 @@
 
 import sys
 from argparse import Namespace
-from typing import Union
+from typing import List, Union
 
 
 def validate_port(port: Union[str, int]) -> int:
@@ -30,6 +30,27 @@ def validate_port(port: Union[str, int]) -> int:
     return port_num
 
 
+def parse_name_list(value: str) -> List[str]:
+    """Split a comma-separated list of names.
+
+    Surrounding whitespace and empty entries are dropped, and repeated names
+    are kept only once, in order of first appearance.
+
+    Args:
+        value: Comma-separated names, e.g. the --usergroup option
+
+    Returns:
+        list: Unique names
+    """
+    if "," not in value:
+        # Usual case of a single name
+        name = value.strip()
+        return [name] if name else []
+    return list(
+        dict.fromkeys(name for name in map(str.strip, value.split(",")) if name)
+    )
+
+
 def validate_selector(args: Namespace, entity_type: str = "connection") -> None:
     """Validate exactly one of name or id is provided and validate ID format.
 
@@ -6,11 +6,16 @@ This class provides backward-compatible API by delegating to specialized reposit
 For new code, consider using the repository classes directly.
 """
 
-from typing import Any, Dict, List, Optional
+import contextlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import mysql.connector
 
-from .repositories.base import BaseGuacamoleRepository
+from .repositories.base import (
+    CONNECT_OPTIONS,
+    BaseGuacamoleRepository,
+    get_pooled_connection,
+)
 from .repositories.user import UserRepository
 from .repositories.usergroup import UserGroupRepository
 from .repositories.connection import ConnectionRepository
@@ -18,6 +23,7 @@ from .repositories.connection_group import ConnectionGroupRepository
 from .repositories.connection_parameters import CONNECTION_PARAMETERS
 from .repositories.user_parameters import USER_PARAMETERS
 
+from .exceptions import ValidationError
 from .ssh_tunnel import create_ssh_tunnel, close_ssh_tunnel
 
 
@@ -39,17 +45,28 @@ class GuacamoleDB:
     USER_PARAMETERS = USER_PARAMETERS
 
     def __init__(
-        self, config_file: str = "~/.guacaman.ini", debug: bool = False
+        self,
+        config_file: str = "~/.guacaman.ini",
+        debug: bool = False,
+        prepared: bool = False,
+        pool_size: int = 0,
     ) -> None:
         """Initialize GuacamoleDB with database configuration.
 
         Args:
             config_file: Path to the configuration file
             debug: Enable debug output
+            prepared: Use server-side prepared statements. Worth enabling when
+                many operations run on one GuacamoleDB instance.
+            pool_size: Take the connection from a process-wide pool of this
+                size instead of opening a new one. Useful for long-running
+                programs that create many GuacamoleDB instances. Ignored
+                when an SSH tunnel is configured.
         """
         self.debug = debug
         self._config_file = config_file
         self.ssh_tunnel = None
+        self._savepoint_depth = 0
 
         # Read configurations
         self.db_config = BaseGuacamoleRepository.read_config(config_file)
@@ -63,10 +80,19 @@ class GuacamoleDB:
             db_connect_config = self._setup_ssh_tunnel(db_connect_config)
 
         # Create single shared connection
-        self.conn = mysql.connector.connect(
-            **db_connect_config, charset="utf8mb4", collation="utf8mb4_general_ci"
+        connect_args = dict(
+            db_connect_config, **CONNECT_OPTIONS, consume_results=prepared
         )
-        self.cursor = self.conn.cursor(buffered=True)
+        if pool_size and self.ssh_tunnel is None:
+            self.conn = get_pooled_connection(pool_size, **connect_args)
+        else:
+            self.conn = mysql.connector.connect(**connect_args)
+        self.cursor = BaseGuacamoleRepository.create_cursor(self.conn, prepared)
+
+        # Run all operations of this instance in one explicit transaction,
+        # committed or rolled back in __exit__, independent of the server's
+        # autocommit default
+        self.conn.start_transaction()
 
         # Initialize repositories with shared connection
         self.users = UserRepository(
@@ -96,6 +122,76 @@ class GuacamoleDB:
         )
         return db_config
 
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator["GuacamoleDB"]:
+        """Make a group of operations all-or-nothing within this instance.
+
+        Everything done on a GuacamoleDB instance already runs in one
+        transaction that is committed when the ``with`` block exits. This
+        marks a savepoint, so that if the enclosed operations raise, only
+        their changes are undone and the rest of the instance's work can
+        still be committed. Blocks can be nested.
+
+        Example:
+            with GuacamoleDB(config) as guacdb:
+                for username, group in new_users:
+                    try:
+                        with guacdb.transaction():
+                            entity_id = guacdb.create_user(username, "secret")
+                            guacdb.add_user_to_usergroup_by_entity_id(
+                                entity_id, group
+                            )
+                    except GuacalibError as e:
+                        print(f"Skipped {username}: {e}")
+        """
+        self._savepoint_depth += 1
+        savepoint = f"guacalib_sp{self._savepoint_depth}"
+        try:
+            self._execute_savepoint_statement(f"SAVEPOINT {savepoint}")
+            try:
+                yield self
+            except Exception:
+                self._execute_savepoint_statement(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                # IDs resolved inside the block may refer to undone rows
+                self.usergroups.clear_id_cache()
+                self.connections.clear_id_cache()
+                raise
+            self._execute_savepoint_statement(f"RELEASE SAVEPOINT {savepoint}")
+        finally:
+            self._savepoint_depth -= 1
+
+    def _execute_savepoint_statement(self, statement: str) -> None:
+        """Run a savepoint statement on a plain, short-lived cursor.
+
+        The shared cursor may be a PreparedCursorCache. Savepoint statements
+        cannot be prepared on the server, and would otherwise push the
+        statements worth keeping out of that cache.
+
+        Args:
+            statement: SAVEPOINT, ROLLBACK TO SAVEPOINT or RELEASE SAVEPOINT
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def checkpoint(self) -> None:
+        """Commit the work done so far and start a new transaction.
+
+        Long-running scripts can call this periodically so that finished
+        work is durable without opening a new GuacamoleDB instance. The
+        rest of the instance's work is still committed when the ``with``
+        block exits.
+
+        Raises:
+            ValidationError: If called inside a transaction() block
+        """
+        if self._savepoint_depth:
+            raise ValidationError("checkpoint() cannot be used inside transaction()")
+        self.conn.commit()
+        self.conn.start_transaction()
+
     def debug_print(self, *args: Any, **kwargs: Any) -> None:
         """Print debug messages if debug mode is enabled."""
         if self.debug:
@@ -112,27 +208,9 @@ class GuacamoleDB:
         traceback: Optional[Any],
     ) -> None:
         """Exit context manager with proper cleanup."""
-        # Determine if we should commit or rollback
-        # Commit on: no exception, or SystemExit with code 0
-        # Rollback on: any other exception, or SystemExit with non-zero code
-        should_commit = False
-        if exc_type is None:
-            should_commit = True
-        elif exc_type is SystemExit:
-            # sys.exit(0) should commit, sys.exit(1) should rollback
-            should_commit = exc_value is not None and exc_value.code == 0
-
-        # Cleanup database connection
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            try:
-                if should_commit:
-                    self.conn.commit()
-                else:
-                    self.conn.rollback()
-            finally:
-                self.conn.close()
+        BaseGuacamoleRepository.close_connection(
+            self.conn, self.cursor, exc_type, exc_value
+        )
 
         # Close SSH tunnel if it was created
         close_ssh_tunnel(self.ssh_tunnel, self.debug_print)
@@ -143,14 +221,26 @@ class GuacamoleDB:
         """List all users."""
         return self.users.list_users()
 
+    def iter_users(self) -> Iterator[str]:
+        """Iterate over all usernames without loading them all at once."""
+        return self.users.iter_users()
+
     def user_exists(self, username: str) -> bool:
         """Check if a user exists."""
         return self.users.user_exists(username)
 
-    def create_user(self, username: str, password: str) -> bool:
-        """Create a new user."""
+    def create_user(self, username: str, password: str) -> int:
+        """Create a new user and return its entity ID."""
         return self.users.create_user(username, password)
 
+    def create_users(self, users: List[Tuple[str, str]]) -> Dict[str, int]:
+        """Create many users at once."""
+        return self.users.create_users(users)
+
+    def delete_users(self, usernames: List[str]) -> None:
+        """Delete many users with a fixed number of statements."""
+        return self.users.delete_users(usernames)
+
     def delete_existing_user(self, username: str) -> bool:
         """Delete a user."""
         return self.users.delete_existing_user(username)
@@ -163,9 +253,11 @@ class GuacamoleDB:
         """Modify a user parameter."""
         return self.users.modify_user(username, param_name, param_value)
 
-    def list_users_with_usergroups(self) -> Dict[str, Dict[str, List[str]]]:
-        """List all users with their group memberships."""
-        return self.users.list_users_with_usergroups()
+    def list_users_with_usergroups(
+        self, names: Optional[List[str]] = None
+    ) -> Dict[str, List[str]]:
+        """List users (all, or only ``names``) with their group memberships."""
+        return self.users.list_users_with_usergroups(names)
 
     # ==================== User group methods ====================
 
@@ -173,6 +265,10 @@ class GuacamoleDB:
         """List all user groups."""
         return self.usergroups.list_usergroups()
 
+    def iter_usergroups(self) -> Iterator[str]:
+        """Iterate over all user group names without loading them all at once."""
+        return self.usergroups.iter_usergroups()
+
     def usergroup_exists(self, group_name: str) -> bool:
         """Check if a user group exists."""
         return self.usergroups.usergroup_exists(group_name)
@@ -195,8 +291,8 @@ class GuacamoleDB:
         """Resolve user group ID from name or ID."""
         return self.usergroups.resolve_usergroup_id(group_name, group_id)
 
-    def create_usergroup(self, group_name: str) -> bool:
-        """Create a new user group."""
+    def create_usergroup(self, group_name: str) -> int:
+        """Create a new user group and return its entity ID."""
         return self.usergroups.create_usergroup(group_name)
 
     def delete_existing_usergroup(self, group_name: str) -> bool:
@@ -211,13 +307,31 @@ class GuacamoleDB:
         """Add a user to a user group."""
         return self.usergroups.add_user_to_usergroup(username, group_name)
 
+    def add_user_to_usergroup_by_entity_id(
+        self, user_entity_id: int, group_name: str
+    ) -> None:
+        """Add a user to a user group by the user's entity ID."""
+        return self.usergroups.add_user_to_usergroup_by_entity_id(
+            user_entity_id, group_name
+        )
+
+    def add_user_to_usergroups_by_entity_id(
+        self, user_entity_id: int, group_names: List[str]
+    ) -> List[str]:
+        """Add a user to several user groups, return unknown group names."""
+        return self.usergroups.add_user_to_usergroups_by_entity_id(
+            user_entity_id, group_names
+        )
+
     def remove_user_from_usergroup(self, username: str, group_name: str) -> bool:
         """Remove a user from a user group."""
         return self.usergroups.remove_user_from_usergroup(username, group_name)
 
-    def list_groups_with_users(self) -> Dict[str, Dict[str, Any]]:
-        """List all groups with their users."""
-        return self.usergroups.list_groups_with_users()
+    def list_groups_with_users(
+        self, names: Optional[List[str]] = None
+    ) -> Dict[str, List[str]]:
+        """List groups (all, or only ``names``) with their users."""
+        return self.usergroups.list_groups_with_users(names)
 
     def list_usergroups_with_users_and_connections(self) -> Dict[str, Dict[str, Any]]:
         """List all groups with their users and connections."""
@@ -307,6 +421,22 @@ class GuacamoleDB:
             entity_name, entity_type, connection_id, group_path
         )
 
+    def grant_connection_permissions(
+        self, entity_names: List[str], entity_type: str, connection_id: int
+    ) -> List[str]:
+        """Grant connection permission to several entities, return unknown names."""
+        return self.connections.grant_connection_permissions(
+            entity_names, entity_type, connection_id
+        )
+
+    def grant_connection_permission_by_entity_id(
+        self, entity_id: int, connection_id: int
+    ) -> None:
+        """Grant connection permission to an entity by its ID."""
+        return self.connections.grant_connection_permission_by_entity_id(
+            entity_id, connection_id
+        )
+
     def grant_connection_permission_to_user(
         self, username: str, connection_name: str
     ) -> bool:
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Permission debugging helpers shared by the library and debug_permissions.py."""
+
+from typing import Any, Dict, Iterator, List
+
+from .entities import ENTITY_TYPE_USER, ENTITY_TYPE_USER_GROUP
+
+CONNECTION_PERMISSIONS_QUERY = """
+    SELECT cp.entity_id, e.name, e.type, cp.permission
+    FROM guacamole_connection_permission cp
+    JOIN guacamole_entity e ON cp.entity_id = e.entity_id
+    WHERE cp.connection_id = %s
+"""
+
+
+def permission_report_lines(
+    cursor: Any,
+    target_id: int,
+    target_type: str,
+    target: str,
+    names_by_type: Dict[str, List[str]],
+) -> Iterator[str]:
+    """Yield a report of all permissions granted on a connection.
+
+    Runs a single query and streams its rows. While doing so, entity names
+    are collected into names_by_type (keyed by entity type), which is used
+    for the user and user group sections and stays available to the caller
+    once the generator is exhausted.
+
+    Args:
+        cursor: Database cursor
+        target_id: Connection ID to report on
+        target_type: Human readable target type, e.g. 'connection'
+        target: Target name used in messages
+        names_by_type: Dict to fill with entity names per entity type
+
+    Yields:
+        str: Report lines without trailing newline
+    """
+    cursor.execute(CONNECTION_PERMISSIONS_QUERY, (target_id,))
+
+    count = 0
+    for entity_id, name, entity_type, permission in cursor:
+        if not count:
+            yield f"Permissions for {target_type} '{target}':"
+        count += 1
+        names_by_type.setdefault(entity_type, []).append(name)
+        yield (
+            f"  Entity ID: {entity_id}, Name: {name}, Type: {entity_type}, "
+            f"Permission: {permission}"
+        )
+    if not count:
+        yield f"No permissions found for {target_type} '{target}'"
+    else:
+        yield f"Found {count} permissions"
+
+    for entity_type, label, prefix in (
+        (ENTITY_TYPE_USER, "user", "User"),
+        (ENTITY_TYPE_USER_GROUP, "user group", "Group"),
+    ):
+        names = names_by_type.get(entity_type, [])
+        if not names:
+            yield f"No {label} permissions found for {target_type} '{target}'"
+        else:
+            yield f"Found {len(names)} {label} permissions:"
+            for name in names:
+                yield f"  {prefix}: {name}"
@@ -2,10 +2,15 @@
 """Base repository class for Guacamole database operations."""
 
 import configparser
+import functools
 import logging
 import mysql.connector
+import mysql.connector.pooling
+from mysql.connector import errorcode
 import os
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 
 from ..exceptions import DatabaseError, EntityNotFoundError, ValidationError
 
@@ -14,6 +19,198 @@ from ..ssh_tunnel import create_ssh_tunnel, close_ssh_tunnel, SSH_TUNNEL_AVAILAB
 # Module logger
 logger = logging.getLogger("guacalib")
 
+# SQL shared by several repositories. Keeping each statement a single
+# module-level string lets prepared cursors reuse the statement handle,
+# since mysql-connector only re-prepares when the SQL string changes.
+SQL_SELECT_ENTITY_ID = (
+    "SELECT entity_id FROM guacamole_entity WHERE name = %s AND type = %s"
+)
+
+# Upper bound on the rows sent in one multi-row statement. It keeps bulk
+# statements well below max_allowed_packet and the 65535 placeholder limit
+# of server-side prepared statements.
+MAX_ROWS_PER_STATEMENT = 1000
+
+# Rows fetched per round-trip by streaming iterators such as iter_users()
+STREAM_BATCH_SIZE = 500
+
+# Prepared statements kept open per connection by PreparedCursorCache.
+# Statements with IN lists or multi-row VALUES differ in SQL text for every
+# row count, so an unbounded cache could approach the server's
+# max_prepared_stmt_count on a long batch.
+PREPARED_CACHE_SIZE = 128
+
+# Prefer the C extension of mysql-connector-python when it can be loaded;
+# otherwise use the pure Python protocol implementation
+USE_PURE = not mysql.connector.HAVE_CEXT
+
+# Options passed to every mysql.connector.connect call. The driver resolves
+# the charset and collation from its built-in table, with no server lookup;
+# it sends the one SET NAMES it always issues after the handshake.
+CONNECT_OPTIONS: Dict[str, Any] = {
+    "charset": "utf8mb4",
+    "collation": "utf8mb4_general_ci",
+    "use_pure": USE_PURE,
+}
+
+# Connection pools shared by all GuacamoleDB instances of a process, keyed by
+# the full set of connection arguments
+_connection_pools: Dict[
+    Tuple[Any, ...], mysql.connector.pooling.MySQLConnectionPool
+] = {}
+_connection_pools_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _read_config_cached(config_file: str, mtime_ns: int) -> Dict[str, Dict[str, str]]:
+    """Parse a config file into a plain dict of sections.
+
+    The modification time is part of the cache key, so an edited file is
+    parsed again while repeated reads of an unchanged file are free.
+
+    Args:
+        config_file: Path to the configuration file
+        mtime_ns: Modification time of the file in nanoseconds
+
+    Returns:
+        dict: Mapping of section name to a dict of its options
+    """
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    return {section: dict(config[section]) for section in config.sections()}
+
+
+def _read_config_sections(config_file: str) -> Dict[str, Dict[str, str]]:
+    """Return the parsed sections of a config file, using the cache.
+
+    Args:
+        config_file: Path to the configuration file
+
+    Returns:
+        dict: Mapping of section name to a dict of its options
+
+    Raises:
+        FileNotFoundError: If config file doesn't exist
+    """
+    return _read_config_cached(config_file, os.stat(config_file).st_mtime_ns)
+
+
+def get_pooled_connection(pool_size: int, **connect_args: Any) -> Any:
+    """Take a connection from a process-wide pool, creating the pool on first use.
+
+    Closing the returned connection hands it back to the pool instead of
+    ending the session, so later GuacamoleDB instances skip the TCP and
+    authentication handshake. The session is not reset on return, which
+    saves another round-trip; callers end their transaction and close
+    their cursors before closing, so no state carries over.
+
+    Args:
+        pool_size: Maximum number of connections kept by the pool
+        **connect_args: Arguments for mysql.connector.connect
+
+    Returns:
+        mysql.connector.pooling.PooledMySQLConnection: Pooled connection
+
+    Raises:
+        mysql.connector.Error: If the pool is exhausted or connecting fails
+    """
+    key = (pool_size, tuple(sorted(connect_args.items())))
+    with _connection_pools_lock:
+        pool = _connection_pools.get(key)
+        if pool is None:
+            pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name=f"guacalib{len(_connection_pools)}",
+                pool_size=pool_size,
+                pool_reset_session=False,
+                **connect_args,
+            )
+            _connection_pools[key] = pool
+    return pool.get_connection()
+
+
+class PreparedCursorCache:
+    """Cursor-like object keeping one prepared cursor per SQL statement.
+
+    A mysql-connector prepared cursor holds a single server-side statement
+    and re-prepares whenever it is given a different SQL string, so sharing
+    one between alternating statements prepares on every call. This class
+    routes each statement to its own prepared cursor, so every distinct
+    statement is prepared once per connection. Result attributes such as
+    ``lastrowid`` and the fetch methods refer to the last executed cursor.
+
+    At most ``maxsize`` statements are kept; the least recently used one is
+    closed, which deallocates it on the server, when another is added.
+    """
+
+    def __init__(self, conn: Any, maxsize: int = PREPARED_CACHE_SIZE) -> None:
+        """Initialize the cache.
+
+        Args:
+            conn: Open MySQL connection
+            maxsize: Maximum number of prepared statements to keep
+        """
+        self._conn = conn
+        self._maxsize = maxsize
+        self._cursors: "OrderedDict[str, Tuple[Any, str]]" = OrderedDict()
+        self._current: Any = None
+
+    def _cursor_for(self, operation: str) -> Tuple[Any, str]:
+        """Return the prepared cursor for a statement and its canonical SQL.
+
+        The driver detects a repeated statement by object identity, so the
+        SQL string first seen for a statement is passed on every later call.
+
+        Args:
+            operation: SQL statement
+
+        Returns:
+            tuple: (prepared cursor, SQL string to execute)
+        """
+        entry = self._cursors.get(operation)
+        if entry is None:
+            if len(self._cursors) >= self._maxsize:
+                evicted, _ = self._cursors.popitem(last=False)[1]
+                evicted.close()
+            entry = (self._conn.cursor(prepared=True), operation)
+            self._cursors[operation] = entry
+        else:
+            self._cursors.move_to_end(operation)
+        self._current = entry[0]
+        return entry
+
+    def execute(self, operation: str, params: Any = None) -> None:
+        """Execute a statement on its prepared cursor."""
+        cursor, operation = self._cursor_for(operation)
+        cursor.execute(operation, params)
+
+    def executemany(self, operation: str, seq_params: Any) -> None:
+        """Execute a statement once per parameter set on its prepared cursor."""
+        cursor, operation = self._cursor_for(operation)
+        cursor.executemany(operation, seq_params)
+
+    def close(self) -> None:
+        """Close all cached cursors."""
+        for cursor, _ in self._cursors.values():
+            cursor.close()
+        self._cursors.clear()
+        self._current = None
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the rows of the last executed cursor.
+
+        Special methods are looked up on the class, so iteration is not
+        covered by __getattr__.
+        """
+        if self._current is None:
+            raise TypeError("No statement has been executed")
+        return iter(self._current)
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate result access to the last executed cursor."""
+        if self._current is None:
+            raise AttributeError(name)
+        return getattr(self._current, name)
+
 
 class BaseGuacamoleRepository:
     """Base class for all Guacamole repositories.
@@ -28,6 +225,7 @@ class BaseGuacamoleRepository:
         conn=None,
         cursor=None,
         ssh_tunnel=None,
+        prepared=False,
     ):
         """Initialize repository with database configuration.
 
@@ -37,6 +235,8 @@ class BaseGuacamoleRepository:
             conn: External database connection (optional, for shared connection)
             cursor: External database cursor (optional, for shared cursor)
             ssh_tunnel: External SSH tunnel object (optional, for shared tunnel)
+            prepared: Use server-side prepared statements for the own cursor
+                (ignored when an external cursor is given)
         """
         self.debug = debug
         self._external_conn = conn is not None
@@ -60,17 +260,25 @@ class BaseGuacamoleRepository:
             self.db_config = self.read_config(config_file)
             self.ssh_tunnel_config = self.read_ssh_tunnel_config(config_file)
             self.ssh_tunnel = None
-            self.conn = self.connect_db()
-            self.cursor = self.conn.cursor(buffered=True)
+            self.conn = self.connect_db(consume_results=prepared)
+            self.cursor = self.create_cursor(self.conn, prepared)
+            # Same as GuacamoleDB: one explicit transaction, committed or
+            # rolled back in __exit__
+            self.conn.start_transaction()
+
+    def debug_print(self, message: Any, *args: Any) -> None:
+        """Log a debug message if debug mode is enabled.
 
-    def debug_print(self, *args: Any, **kwargs: Any) -> None:
-        """Log debug messages if debug mode is enabled.
+        As with logging, ``args`` are %-formatted into the message only when
+        it is logged, so frequently called methods can pass values instead
+        of building an f-string on every call.
 
-        Uses logging module for library usage, falls back to print for CLI.
+        Args:
+            message: Message, optionally with %-style placeholders
+            *args: Values for the placeholders
         """
         if self.debug:
-            message = " ".join(str(arg) for arg in args)
-            logger.debug(message)
+            logger.debug(str(message), *args)
 
     def __enter__(self) -> "BaseGuacamoleRepository":
         """Enter context manager."""
@@ -83,9 +291,31 @@ class BaseGuacamoleRepository:
         traceback: Optional[Any],
     ) -> None:
         """Exit context manager with proper cleanup."""
-        # Determine if we should commit or rollback
-        # Commit on: no exception, or SystemExit with code 0
-        # Rollback on: any other exception, or SystemExit with non-zero code
+        # Only cleanup if we own the connection
+        if not self._external_conn:
+            self.close_connection(self.conn, self.cursor, exc_type, exc_value)
+            # Close SSH tunnel if we own it
+            if not self._external_tunnel:
+                close_ssh_tunnel(self.ssh_tunnel)
+
+    @staticmethod
+    def close_connection(
+        conn: Any,
+        cursor: Any,
+        exc_type: Optional[type],
+        exc_value: Optional[BaseException],
+    ) -> None:
+        """Finish the transaction and close the cursor and connection.
+
+        Commits on no exception or SystemExit with code 0, and rolls back on
+        any other exception or SystemExit with a non-zero code.
+
+        Args:
+            conn: Database connection
+            cursor: Database cursor
+            exc_type: Exception type passed to __exit__
+            exc_value: Exception passed to __exit__
+        """
         should_commit = False
         if exc_type is None:
             should_commit = True
@@ -93,21 +323,16 @@ class BaseGuacamoleRepository:
             # sys.exit(0) should commit, sys.exit(1) should rollback
             should_commit = exc_value is not None and exc_value.code == 0
 
-        # Only cleanup if we own the connection
-        if not self._external_conn:
-            if self.cursor:
-                self.cursor.close()
-            if self.conn:
-                try:
-                    if should_commit:
-                        self.conn.commit()
-                    else:
-                        self.conn.rollback()
-                finally:
-                    self.conn.close()
-            # Close SSH tunnel if we own it
-            if not self._external_tunnel:
-                close_ssh_tunnel(self.ssh_tunnel)
+        if cursor:
+            cursor.close()
+        if conn:
+            try:
+                if should_commit:
+                    conn.commit()
+                else:
+                    conn.rollback()
+            finally:
+                conn.close()
 
     @staticmethod
     def read_config(config_file: str) -> Dict[str, str]:
@@ -123,7 +348,6 @@ class BaseGuacamoleRepository:
             FileNotFoundError: If config file doesn't exist
             ValueError: If config file is invalid
         """
-        config = configparser.ConfigParser()
         if not os.path.exists(config_file):
             raise FileNotFoundError(
                 f"Config file not found. Please create a config file at {config_file} "
@@ -136,7 +360,7 @@ class BaseGuacamoleRepository:
             )
 
         try:
-            config.read(config_file)
+            config = _read_config_sections(config_file)
             if "mysql" not in config:
                 raise ValueError("Missing [mysql] section in config file")
 
@@ -224,8 +448,7 @@ class BaseGuacamoleRepository:
             return None
 
         try:
-            config = configparser.ConfigParser()
-            config.read(config_file)
+            config = _read_config_sections(config_file)
 
             if "ssh_tunnel" not in config:
                 return None
@@ -285,11 +508,73 @@ class BaseGuacamoleRepository:
         except Exception as e:
             raise ValueError(f"Error reading SSH tunnel config: {str(e)}") from e
 
-    def connect_db(self) -> Any:
+    @staticmethod
+    def create_cursor(conn: Any, prepared: bool = False) -> Any:
+        """Create the cursor shared by repository methods.
+
+        The default cursor is buffered so that a partially read result never
+        blocks the next statement. In prepared mode statements use the binary
+        protocol and each distinct SQL statement keeps its server-side handle
+        (see PreparedCursorCache), which pays off when the same statements
+        run many times on one connection. Prepared cursors cannot be
+        buffered, so the connection must be opened with
+        ``consume_results=True``.
+
+        Args:
+            conn: Open MySQL connection
+            prepared: Create a prepared-statement cursor
+
+        Returns:
+            mysql.connector.cursor.MySQLCursor or PreparedCursorCache:
+            Database cursor
+        """
+        if prepared:
+            return PreparedCursorCache(conn)
+        return conn.cursor(buffered=True)
+
+    def _iter_rows(self, operation: str, params: Any, action: str) -> Iterator[Tuple]:
+        """Yield the rows of a query without buffering the whole result.
+
+        The query runs on its own unbuffered cursor and rows are fetched in
+        batches of STREAM_BATCH_SIZE. No other statement can run on the
+        connection until the iterator is exhausted or closed.
+
+        Args:
+            operation: SQL query
+            params: Query parameters
+            action: What the query does, for error messages (e.g. 'listing users')
+
+        Yields:
+            tuple: Result rows
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        cursor = self.conn.cursor(buffered=False)
+        try:
+            cursor.execute(operation, params)
+            while True:
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error {action}: {e}") from e
+        finally:
+            # Drop the rest of the result if the caller stopped early
+            if self.conn.unread_result:
+                self.conn.consume_results()
+            cursor.close()
+
+    def connect_db(self, consume_results: bool = False) -> Any:
         """Establish database connection.
 
         Creates SSH tunnel if configured, then connects to MySQL.
 
+        Args:
+            consume_results: Automatically read pending rows before the next
+                statement (required for unbuffered prepared cursors)
+
         Returns:
             mysql.connector.connection: Database connection object
 
@@ -307,9 +592,14 @@ class BaseGuacamoleRepository:
                     self.ssh_tunnel_config, db_config, self.debug_print
                 )
 
+        if USE_PURE:
+            self.debug_print(
+                "mysql-connector C extension not available, using pure Python driver"
+            )
+
         try:
             return mysql.connector.connect(
-                **db_config, charset="utf8mb4", collation="utf8mb4_general_ci"
+                **db_config, **CONNECT_OPTIONS, consume_results=consume_results
             )
         except mysql.connector.Error as e:
             # Cleanup tunnel on connection failure
@@ -340,6 +630,64 @@ class BaseGuacamoleRepository:
             )
         return id_value
 
+    @staticmethod
+    def is_duplicate_entry(error: mysql.connector.Error) -> bool:
+        """Check whether an error was caused by a unique key violation.
+
+        Args:
+            error: Error raised by mysql-connector
+
+        Returns:
+            bool: True if the statement hit an existing unique key
+        """
+        return error.errno == errorcode.ER_DUP_ENTRY
+
+    @staticmethod
+    def match_names(
+        names: List[str], rows: Iterable[Tuple[str, Any]]
+    ) -> Dict[str, Any]:
+        """Map names given to a ``name IN (...)`` query to the rows it returned.
+
+        MySQL compares entity names under the schema's case-insensitive
+        collation and returns them as stored, so a given name is matched
+        case-insensitively, as a ``name = %s`` lookup would match it.
+
+        Args:
+            names: Names passed to the query
+            rows: (stored name, value) rows returned by the query
+
+        Returns:
+            dict: Value per given name that matched a row
+        """
+        values = {name.casefold(): value for name, value in rows}
+        return {
+            name: values[name.casefold()] for name in names if name.casefold() in values
+        }
+
+    @staticmethod
+    def group_rows(
+        keys: Iterable[Any], rows: Iterable[Tuple[Any, Any]]
+    ) -> Dict[Any, List[Any]]:
+        """Collect (key, value) rows into a list of values per key.
+
+        Listing methods fetch the keys and the (key, value) pairs with two
+        plain queries and aggregate them here rather than with GROUP_CONCAT,
+        which is truncated at group_concat_max_len and cannot be split
+        safely when names contain commas.
+
+        Args:
+            keys: Keys to collect values for, in output order
+            rows: (key, value) rows; rows for other keys are ignored
+
+        Returns:
+            dict: List of values per key, empty for keys without rows
+        """
+        grouped: Dict[Any, List[Any]] = {key: [] for key in keys}
+        for key, value in rows:
+            if key in grouped:
+                grouped[key].append(value)
+        return grouped
+
     def _resolve_entity_id(
         self,
         entity_name: Optional[str],
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 """Connection repository for Guacamole database operations."""
 
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import mysql.connector
 
-from .base import BaseGuacamoleRepository
+from .base import SQL_SELECT_ENTITY_ID, BaseGuacamoleRepository
 from .connection_group import ConnectionGroupRepository
 from .connection_parameters import CONNECTION_PARAMETERS
 from ..entities import ENTITY_TYPE_USER, ENTITY_TYPE_USER_GROUP
@@ -16,12 +16,35 @@ from ..exceptions import (
     PermissionError,
 )
 
+# Statements removing a connection and its dependent rows, in execution order
+SQL_DELETE_CONNECTION_BY_ID = (
+    # Connection history
+    "DELETE FROM guacamole_connection_history WHERE connection_id = %s",
+    # Connection parameters
+    "DELETE FROM guacamole_connection_parameter WHERE connection_id = %s",
+    # Connection permissions
+    "DELETE FROM guacamole_connection_permission WHERE connection_id = %s",
+    # Finally the connection
+    "DELETE FROM guacamole_connection WHERE connection_id = %s",
+)
+
 
 class ConnectionRepository(BaseGuacamoleRepository):
     """Repository for connection-related database operations."""
 
     CONNECTION_PARAMETERS = CONNECTION_PARAMETERS
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the repository, see BaseGuacamoleRepository."""
+        super().__init__(*args, **kwargs)
+        # Connection IDs already resolved by name on this connection. Entries
+        # are dropped when the connection is deleted through this repository.
+        self._connection_ids: Dict[str, int] = {}
+
+    def clear_id_cache(self) -> None:
+        """Forget the connection IDs resolved by name so far."""
+        self._connection_ids.clear()
+
     def get_connection_name_by_id(self, connection_id: int) -> Optional[str]:
         """Get connection name by ID.
 
@@ -64,6 +87,9 @@ class ConnectionRepository(BaseGuacamoleRepository):
             EntityNotFoundError: If connection not found
             DatabaseError: If database operation fails
         """
+        if connection_id is None and connection_name in self._connection_ids:
+            return self._connection_ids[connection_name]
+
         id_query = (
             "SELECT connection_id FROM guacamole_connection WHERE connection_id = %s"
         )
@@ -71,13 +97,16 @@ class ConnectionRepository(BaseGuacamoleRepository):
             "SELECT connection_id FROM guacamole_connection WHERE connection_name = %s"
         )
 
-        return self._resolve_entity_id(
+        resolved_id = self._resolve_entity_id(
             entity_name=connection_name,
             entity_id=connection_id,
             entity_type="Connection",
             id_query=id_query,
             name_query=name_query,
         )
+        if connection_name is not None:
+            self._connection_ids[connection_name] = resolved_id
+        return resolved_id
 
     def connection_exists(
         self,
@@ -113,7 +142,7 @@ class ConnectionRepository(BaseGuacamoleRepository):
         connection_type: str,
         connection_name: str,
         hostname: str,
-        port: str,
+        port: int,
         vnc_password: str,
         parent_group_id: Optional[int] = None,
     ) -> int:
@@ -151,32 +180,31 @@ class ConnectionRepository(BaseGuacamoleRepository):
                 (connection_name, connection_type, parent_group_id),
             )
 
-            # Get connection_id
-            self.cursor.execute(
-                """
-                SELECT connection_id FROM guacamole_connection
-                WHERE connection_name = %s
-            """,
-                (connection_name,),
-            )
-            connection_id = self.cursor.fetchone()[0]
+            # The auto-increment id comes back with the INSERT's OK packet
+            connection_id = self.cursor.lastrowid
 
-            # Create connection parameters
+            # Create connection parameters with one multi-row INSERT. The
+            # VALUES list is built here rather than left to executemany(),
+            # which only rewrites batches on the text protocol and runs one
+            # statement per row on a prepared cursor. Unset optional values
+            # (e.g. no password) are skipped; parameter_value is NOT NULL.
             params = [
-                ("hostname", hostname),
-                ("port", port),
-                ("password", vnc_password),
+                (connection_id, param_name, param_value)
+                for param_name, param_value in (
+                    ("hostname", hostname),
+                    ("port", port),
+                    ("password", vnc_password),
+                )
+                if param_value is not None
             ]
 
-            for param_name, param_value in params:
-                self.cursor.execute(
-                    """
-                    INSERT INTO guacamole_connection_parameter
-                    (connection_id, parameter_name, parameter_value)
-                    VALUES (%s, %s, %s)
-                """,
-                    (connection_id, param_name, param_value),
-                )
+            self.cursor.execute(
+                """
+                INSERT INTO guacamole_connection_parameter
+                (connection_id, parameter_name, parameter_value)
+                VALUES """ + ", ".join(["(%s, %s, %s)"] * len(params)),
+                [value for row in params for value in row],
+            )
 
             return connection_id
 
@@ -199,58 +227,56 @@ class ConnectionRepository(BaseGuacamoleRepository):
                 connection_name, connection_id
             )
 
-            # Get connection name for logging if we only have ID
-            if connection_name is None:
+            # Get connection name for logging if we only have ID; the
+            # lookup is only worth a round-trip when debug output is on
+            if connection_name is None and self.debug:
                 connection_name = self.get_connection_name_by_id(resolved_connection_id)
 
             self.debug_print(
-                f"Attempting to delete connection: {connection_name} (ID: {resolved_connection_id})"
+                "Attempting to delete connection: %s (ID: %s)",
+                connection_name,
+                resolved_connection_id,
             )
 
-            # Delete connection history
-            self.debug_print("Deleting connection history...")
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_connection_history
-                WHERE connection_id = %s
-            """,
-                (resolved_connection_id,),
-            )
+            # Dependent rows are deleted by the resolved primary key
+            for query in SQL_DELETE_CONNECTION_BY_ID:
+                self.cursor.execute(query, (resolved_connection_id,))
+            self._connection_ids = {
+                name: cached_id
+                for name, cached_id in self._connection_ids.items()
+                if cached_id != resolved_connection_id
+            }
 
-            # Delete connection parameters
-            self.debug_print("Deleting connection parameters...")
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_connection_parameter
-                WHERE connection_id = %s
-            """,
-                (resolved_connection_id,),
-            )
+            self.debug_print("Successfully deleted connection '%s'", connection_name)
 
-            # Delete connection permissions
-            self.debug_print("Deleting connection permissions...")
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_connection_permission
-                WHERE connection_id = %s
-            """,
-                (resolved_connection_id,),
-            )
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error deleting existing connection: {e}") from e
 
-            # Finally delete the connection
-            self.debug_print("Deleting connection...")
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_connection
-                WHERE connection_id = %s
-            """,
-                (resolved_connection_id,),
-            )
+    def _upsert_connection_parameter(
+        self, connection_id: int, param_name: str, param_value: str
+    ) -> None:
+        """Insert a connection parameter or update its value if it exists.
 
-            self.debug_print(f"Successfully deleted connection '{connection_name}'")
+        Relies on the (connection_id, parameter_name) primary key, so this is
+        one statement instead of a SELECT followed by an UPDATE or INSERT.
+        VALUES() reuses the inserted value, so each value is bound once with
+        positional parameters, which prepared cursors can re-execute without
+        preparing the statement again.
 
-        except mysql.connector.Error as e:
-            raise DatabaseError(f"Error deleting existing connection: {e}") from e
+        Args:
+            connection_id: Connection ID
+            param_name: Parameter name
+            param_value: Parameter value
+        """
+        self.cursor.execute(
+            """
+            INSERT INTO guacamole_connection_parameter
+            (connection_id, parameter_name, parameter_value)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE parameter_value = VALUES(parameter_value)
+        """,
+            (connection_id, param_name, param_value),
+        )
 
     def modify_connection(
         self,
@@ -313,32 +339,9 @@ class ConnectionRepository(BaseGuacamoleRepository):
                         )
 
                     if param_value.lower() == "true":
-                        self.cursor.execute(
-                            """
-                            SELECT parameter_value FROM guacamole_connection_parameter
-                            WHERE connection_id = %s AND parameter_name = %s
-                        """,
-                            (resolved_connection_id, param_name),
+                        self._upsert_connection_parameter(
+                            resolved_connection_id, param_name, "true"
                         )
-
-                        if self.cursor.fetchone():
-                            self.cursor.execute(
-                                """
-                                UPDATE guacamole_connection_parameter
-                                SET parameter_value = 'true'
-                                WHERE connection_id = %s AND parameter_name = %s
-                            """,
-                                (resolved_connection_id, param_name),
-                            )
-                        else:
-                            self.cursor.execute(
-                                """
-                                INSERT INTO guacamole_connection_parameter
-                                (connection_id, parameter_name, parameter_value)
-                                VALUES (%s, %s, 'true')
-                            """,
-                                (resolved_connection_id, param_name),
-                            )
                     else:
                         self.cursor.execute(
                             """
@@ -358,33 +361,10 @@ class ConnectionRepository(BaseGuacamoleRepository):
                             )
 
                     # Regular parameter handling
-                    self.cursor.execute(
-                        """
-                        SELECT parameter_value FROM guacamole_connection_parameter
-                        WHERE connection_id = %s AND parameter_name = %s
-                    """,
-                        (resolved_connection_id, param_name),
+                    self._upsert_connection_parameter(
+                        resolved_connection_id, param_name, param_value
                     )
 
-                    if self.cursor.fetchone():
-                        self.cursor.execute(
-                            """
-                            UPDATE guacamole_connection_parameter
-                            SET parameter_value = %s
-                            WHERE connection_id = %s AND parameter_name = %s
-                        """,
-                            (param_value, resolved_connection_id, param_name),
-                        )
-                    else:
-                        self.cursor.execute(
-                            """
-                            INSERT INTO guacamole_connection_parameter
-                            (connection_id, parameter_name, parameter_value)
-                            VALUES (%s, %s, %s)
-                        """,
-                            (resolved_connection_id, param_name, param_value),
-                        )
-
             if self.cursor.rowcount == 0:
                 raise ValidationError(
                     f"Failed to update connection parameter: {param_name}",
@@ -526,34 +506,29 @@ class ConnectionRepository(BaseGuacamoleRepository):
         try:
             if group_path:
                 self.debug_print(f"Processing group path: {group_path}")
-                # Need to resolve group path
-
-                # Simple resolution for single-level group
+                # Simple resolution for single-level group. The lookup is a
+                # derived table of the UPDATE, so the connection is moved in
+                # one statement and left alone if the group does not exist.
+                group_name = group_path.split("/")[-1]
+                self.debug_print(
+                    f"Assigning connection {connection_id} to parent group '{group_name}'"
+                )
                 self.cursor.execute(
                     """
-                    SELECT connection_group_id
-                    FROM guacamole_connection_group
-                    WHERE connection_group_name = %s
-                    LIMIT 1
+                    UPDATE guacamole_connection c
+                    JOIN (
+                        SELECT connection_group_id
+                        FROM guacamole_connection_group
+                        WHERE connection_group_name = %s
+                        LIMIT 1
+                    ) g
+                    SET c.parent_id = g.connection_group_id
+                    WHERE c.connection_id = %s
                 """,
-                    (group_path.split("/")[-1],),
+                    (group_name, connection_id),
                 )
-                result = self.cursor.fetchone()
-                if result:
-                    parent_group_id = result[0]
-                    self.debug_print(
-                        f"Assigning connection {connection_id} to parent group {parent_group_id}"
-                    )
-                    self.cursor.execute(
-                        """
-                        UPDATE guacamole_connection
-                        SET parent_id = %s
-                        WHERE connection_id = %s
-                    """,
-                        (parent_group_id, connection_id),
-                    )
 
-            self.debug_print(f"Granting permission to {entity_type}:{entity_name}")
+            self.debug_print("Granting permission to %s:%s", entity_type, entity_name)
             self.cursor.execute(
                 """
                 INSERT INTO guacamole_connection_permission (entity_id, connection_id, permission)
@@ -567,6 +542,80 @@ class ConnectionRepository(BaseGuacamoleRepository):
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error granting connection permission: {e}") from e
 
+    def grant_connection_permissions(
+        self, entity_names: List[str], entity_type: str, connection_id: int
+    ) -> List[str]:
+        """Grant connection permission to several entities of one type.
+
+        All grants are made with a single INSERT ... SELECT. Names that do
+        not match an entity are skipped and returned.
+
+        Args:
+            entity_names: Entity names (users or groups)
+            entity_type: Entity type ('USER' or 'USER_GROUP')
+            connection_id: Connection ID
+
+        Returns:
+            list: Names that do not exist, in the given order
+        """
+        names = list(dict.fromkeys(entity_names))
+        if not names:
+            return []
+
+        placeholders = ", ".join(["%s"] * len(names))
+        try:
+            self.debug_print("Granting permission to %s: %s", entity_type, names)
+            self.cursor.execute(
+                f"""
+                INSERT INTO guacamole_connection_permission (entity_id, connection_id, permission)
+                SELECT entity.entity_id, %s, 'READ'
+                FROM guacamole_entity entity
+                WHERE entity.type = %s AND entity.name IN ({placeholders})
+            """,
+                (connection_id, entity_type, *names),
+            )
+            if self.cursor.rowcount == len(names):
+                return []
+
+            # Some names matched nothing; find out which
+            self.cursor.execute(
+                f"""
+                SELECT name FROM guacamole_entity
+                WHERE type = %s AND name IN ({placeholders})
+            """,
+                (entity_type, *names),
+            )
+            found = {row[0] for row in self.cursor.fetchall()}
+            return [name for name in names if name not in found]
+
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error granting connection permissions: {e}") from e
+
+    def grant_connection_permission_by_entity_id(
+        self, entity_id: int, connection_id: int
+    ) -> None:
+        """Grant connection permission to an entity whose ID is already known.
+
+        Unlike grant_connection_permission, this does not look the entity up
+        by name, e.g. right after the entity was created.
+
+        Args:
+            entity_id: Entity ID (user or group)
+            connection_id: Connection ID
+        """
+        try:
+            self.debug_print("Granting permission to entity ID %s", entity_id)
+            self.cursor.execute(
+                """
+                INSERT INTO guacamole_connection_permission
+                (entity_id, connection_id, permission)
+                VALUES (%s, %s, 'READ')
+            """,
+                (entity_id, connection_id),
+            )
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error granting connection permission: {e}") from e
+
     def grant_connection_permission_to_user(
         self, username: str, connection_name: str
     ) -> bool:
@@ -594,13 +643,7 @@ class ConnectionRepository(BaseGuacamoleRepository):
             connection_id = result[0]
 
             # Get user entity ID
-            self.cursor.execute(
-                """
-                SELECT entity_id FROM guacamole_entity
-                WHERE name = %s AND type = %s
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+            self.cursor.execute(SQL_SELECT_ENTITY_ID, (username, ENTITY_TYPE_USER))
             result = self.cursor.fetchone()
             if not result:
                 raise EntityNotFoundError("user", username)
@@ -623,14 +666,7 @@ class ConnectionRepository(BaseGuacamoleRepository):
                 )
 
             # Grant permission
-            self.cursor.execute(
-                """
-                INSERT INTO guacamole_connection_permission
-                (entity_id, connection_id, permission)
-                VALUES (%s, %s, 'READ')
-            """,
-                (entity_id, connection_id),
-            )
+            self.grant_connection_permission_by_entity_id(entity_id, connection_id)
 
             return True
 
@@ -664,13 +700,7 @@ class ConnectionRepository(BaseGuacamoleRepository):
             connection_id = result[0]
 
             # Get user entity ID
-            self.cursor.execute(
-                """
-                SELECT entity_id FROM guacamole_entity
-                WHERE name = %s AND type = %s
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+            self.cursor.execute(SQL_SELECT_ENTITY_ID, (username, ENTITY_TYPE_USER))
             result = self.cursor.fetchone()
             if not result:
                 raise EntityNotFoundError("user", username)
@@ -744,22 +774,25 @@ class ConnectionRepository(BaseGuacamoleRepository):
 
             connections_info = self.cursor.fetchall()
 
+            # Get user permissions of all connections at once instead of
+            # one query per connection
+            self.cursor.execute(
+                """
+                SELECT cp.connection_id, e.name
+                FROM guacamole_connection_permission cp
+                JOIN guacamole_entity e ON cp.entity_id = e.entity_id
+                WHERE e.type = %s
+            """,
+                (ENTITY_TYPE_USER,),
+            )
+            users_by_connection: Dict[int, List[str]] = {}
+            for conn_id, username in self.cursor.fetchall():
+                users_by_connection.setdefault(conn_id, []).append(username)
+
             result = []
             for conn_info in connections_info:
                 conn_id, name, protocol, host, port, groups, parent = conn_info
-
-                # Get user permissions for this connection
-                self.cursor.execute(
-                    """
-                    SELECT e.name
-                    FROM guacamole_connection_permission cp
-                    JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-                    WHERE cp.connection_id = %s AND e.type = %s
-                """,
-                    (conn_id, ENTITY_TYPE_USER),
-                )
-
-                user_permissions = [row[0] for row in self.cursor.fetchall()]
+                user_permissions = users_by_connection.get(conn_id, [])
 
                 result.append(
                     (
@@ -6,6 +6,7 @@ from typing import Any, Callable, Dict, Optional
 import mysql.connector
 
 from .base import BaseGuacamoleRepository
+from ..debug import permission_report_lines
 from ..entities import ENTITY_TYPE_USER
 from ..exceptions import (
     DatabaseError,
@@ -77,48 +78,48 @@ class ConnectionGroupRepository(BaseGuacamoleRepository):
             EntityNotFoundError: If group not found in path
             DatabaseError: If database operation fails
         """
-        try:
-            groups = group_path.split("/")
-            parent_group_id = None
-
-            self.debug_print(f"Resolving group path: {group_path}")
-
-            for group_name in groups:
-                sql = """
-                    SELECT connection_group_id
-                    FROM guacamole_connection_group
-                    WHERE connection_group_name = %s
-                """
-                params = [group_name]
-
-                if parent_group_id is not None:
-                    sql += " AND parent_id = %s"
-                    params.append(parent_group_id)
-                else:
-                    sql += " AND parent_id IS NULL"
-
-                sql += " ORDER BY connection_group_id LIMIT 1"
-
-                self.debug_print(f"Executing SQL:\n{sql}\nWith params: {params}")
-
-                self.cursor.execute(sql, tuple(params))
-
-                result = self.cursor.fetchone()
-                if not result:
-                    raise EntityNotFoundError(
-                        "connection group",
-                        group_name,
-                        f"Group '{group_name}' not found in path '{group_path}'",
-                    )
-
-                parent_group_id = result[0]
-                self.debug_print(f"Found group ID {parent_group_id} for '{group_name}'")
-
-            return parent_group_id
+        groups = group_path.split("/")
+        self.debug_print(f"Resolving group path: {group_path}")
+
+        # Resolve the whole path in one query: one self-join per path level.
+        # LEFT JOINs leave the IDs from the first missing level on NULL, and
+        # ordering by all IDs picks the lowest matching ID at every level.
+        columns = ", ".join(
+            f"g{level}.connection_group_id" for level in range(len(groups))
+        )
+        joins = "".join(
+            f"""
+            LEFT JOIN guacamole_connection_group g{level}
+                ON g{level}.parent_id = g{level - 1}.connection_group_id
+                AND g{level}.connection_group_name = %s"""
+            for level in range(1, len(groups))
+        )
+        sql = f"""
+            SELECT {columns}
+            FROM guacamole_connection_group g0{joins}
+            WHERE g0.connection_group_name = %s AND g0.parent_id IS NULL
+            ORDER BY {columns}
+            LIMIT 1
+        """
 
+        try:
+            self.cursor.execute(sql, (*groups[1:], groups[0]))
+            result = self.cursor.fetchone()
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error resolving group path: {e}") from e
 
+        group_ids = list(result) if result else [None]
+        for group_name, group_id in zip(groups, group_ids):
+            if group_id is None:
+                raise EntityNotFoundError(
+                    "connection group",
+                    group_name,
+                    f"Group '{group_name}' not found in path '{group_path}'",
+                )
+
+        self.debug_print(f"Found group ID {group_ids[-1]} for '{groups[-1]}'")
+        return group_ids[-1]
+
     def get_connection_group_name_by_id(self, group_id: int) -> Optional[str]:
         """Get connection group name by ID.
 
@@ -303,19 +304,15 @@ class ConnectionGroupRepository(BaseGuacamoleRepository):
                 (group_name, parent_group_id),
             )
 
-            # Verify the group was created
-            self.cursor.execute(
-                """
-                SELECT connection_group_id
-                FROM guacamole_connection_group
-                WHERE connection_group_name = %s
-            """,
-                (group_name,),
-            )
-            if not self.cursor.fetchone():
+            # Verify the group was created; the new ID comes back with the
+            # INSERT, so no lookup by name is needed
+            if not self.cursor.lastrowid:
                 raise ValidationError(
                     "Failed to create connection group - no ID returned"
                 )
+            self.debug_print(
+                f"Created connection group '{group_name}' with ID {self.cursor.lastrowid}"
+            )
 
             return True
 
@@ -337,8 +334,9 @@ class ConnectionGroupRepository(BaseGuacamoleRepository):
         try:
             resolved_group_id = self.resolve_conngroup_id(group_name, group_id)
 
-            # Get group name for logging if we only have ID
-            if group_name is None:
+            # Get group name for logging if we only have ID; the lookup is
+            # only worth a round-trip when debug output is on
+            if group_name is None and self.debug:
                 group_name = self.get_connection_group_name_by_id(resolved_group_id)
 
             self.debug_print(
@@ -564,50 +562,10 @@ class ConnectionGroupRepository(BaseGuacamoleRepository):
             connection_id = result[0]
             self.debug_print(f"Connection ID: {connection_id}")
 
-            # Check all permissions
-            self.cursor.execute(
-                """
-                SELECT cp.entity_id, e.name, e.type, cp.permission
-                FROM guacamole_connection_permission cp
-                JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-                WHERE cp.connection_id = %s
-            """,
-                (connection_id,),
-            )
-
-            permissions = self.cursor.fetchall()
-            if not permissions:
-                self.debug_print(
-                    f"No permissions found for connection '{connection_name}'"
-                )
-            else:
-                self.debug_print(f"Found {len(permissions)} permissions:")
-                for perm in permissions:
-                    entity_id, name, entity_type, permission = perm
-                    self.debug_print(
-                        f"  Entity ID: {entity_id}, Name: {name}, Type: {entity_type}, Permission: {permission}"
-                    )
-
-            # Specifically check user permissions
-            self.cursor.execute(
-                """
-                SELECT e.name
-                FROM guacamole_connection_permission cp
-                JOIN guacamole_entity e ON cp.entity_id = e.entity_id
-                WHERE cp.connection_id = %s AND e.type = %s
-            """,
-                (connection_id, ENTITY_TYPE_USER),
-            )
-
-            user_permissions = self.cursor.fetchall()
-            if not user_permissions:
-                self.debug_print(
-                    f"No user permissions found for connection '{connection_name}'"
-                )
-            else:
-                self.debug_print(f"Found {len(user_permissions)} user permissions:")
-                for perm in user_permissions:
-                    self.debug_print(f"  User: {perm[0]}")
+            for line in permission_report_lines(
+                self.cursor, connection_id, "connection", connection_name, {}
+            ):
+                self.debug_print(line)
 
             self.debug_print("End of debug info")
 
@@ -2,18 +2,41 @@
 """User repository for Guacamole database operations."""
 
 import re
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import mysql.connector
 import hashlib
 import os
 import binascii
 
-from .base import BaseGuacamoleRepository
+from .base import (
+    MAX_ROWS_PER_STATEMENT,
+    SQL_SELECT_ENTITY_ID,
+    BaseGuacamoleRepository,
+)
 from .user_parameters import USER_PARAMETERS
 from ..entities import ENTITY_TYPE_USER
 from ..exceptions import DatabaseError, EntityNotFoundError, ValidationError
 
+# Tables holding a user's rows and their entity ID column, in deletion order
+USER_ROW_TABLES = (
+    # User group permissions first
+    ("guacamole_user_group_permission", "entity_id"),
+    # User group memberships
+    ("guacamole_user_group_member", "member_entity_id"),
+    # User permissions
+    ("guacamole_connection_permission", "entity_id"),
+    # User
+    ("guacamole_user", "entity_id"),
+    # Entity
+    ("guacamole_entity", "entity_id"),
+)
+
+# Statements removing a user and its dependent rows, in execution order
+SQL_DELETE_USER_BY_ENTITY_ID = tuple(
+    f"DELETE FROM {table} WHERE {column} = %s" for table, column in USER_ROW_TABLES
+)
+
 
 class UserRepository(BaseGuacamoleRepository):
     """Repository for user-related database operations."""
@@ -26,19 +49,25 @@ class UserRepository(BaseGuacamoleRepository):
         Returns:
             list: List of usernames
         """
-        try:
-            self.cursor.execute(
-                """
-                SELECT name
-                FROM guacamole_entity
-                WHERE type = %s
-                ORDER BY name
-            """,
-                (ENTITY_TYPE_USER,),
-            )
-            return [row[0] for row in self.cursor.fetchall()]
-        except mysql.connector.Error as e:
-            raise DatabaseError(f"Error listing users: {e}") from e
+        return list(self.iter_users())
+
+    def iter_users(self) -> Iterator[str]:
+        """Iterate over all usernames without loading them all at once.
+
+        Yields:
+            str: Usernames in alphabetical order
+        """
+        for row in self._iter_rows(
+            """
+            SELECT name
+            FROM guacamole_entity
+            WHERE type = %s
+            ORDER BY name
+        """,
+            (ENTITY_TYPE_USER,),
+            "listing users",
+        ):
+            yield row[0]
 
     def user_exists(self, username: str) -> bool:
         """Check if a user with the given name exists.
@@ -61,26 +90,43 @@ class UserRepository(BaseGuacamoleRepository):
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error checking user existence: {e}") from e
 
-    def create_user(self, username: str, password: str) -> None:
-        """Create a new user with hashed password.
+    @staticmethod
+    def _hash_password(password: str) -> Tuple[bytes, bytes]:
+        """Hash a password the way Guacamole expects.
 
         Args:
-            username: Username for the new user
             password: Plain text password
+
+        Returns:
+            tuple: (password_hash, password_salt) as binary values
         """
-        try:
-            # Generate random 32-byte salt
-            salt = os.urandom(32)
+        # Generate random 32-byte salt
+        salt = os.urandom(32)
+
+        # Convert salt to uppercase hex string as Guacamole expects
+        salt_hex = binascii.hexlify(salt).upper()
+
+        # Create password hash using Guacamole's method: SHA256(password + hex(salt))
+        digest = hashlib.sha256(password.encode("utf-8") + salt_hex).digest()
 
-            # Convert salt to uppercase hex string as Guacamole expects
-            salt_hex = binascii.hexlify(salt).upper()
+        return digest, salt
 
-            # Create password hash using Guacamole's method: SHA256(password + hex(salt))
-            digest = hashlib.sha256(password.encode("utf-8") + salt_hex).digest()
+    def create_user(self, username: str, password: str) -> int:
+        """Create a new user with hashed password.
 
-            # Get binary representations
-            password_hash = digest
-            password_salt = salt
+        Args:
+            username: Username for the new user
+            password: Plain text password
+
+        Returns:
+            int: Entity ID of the new user
+
+        Raises:
+            ValidationError: If a user with this name already exists
+            DatabaseError: If database operation fails
+        """
+        try:
+            password_hash, password_salt = self._hash_password(password)
 
             # Create entity
             self.cursor.execute(
@@ -90,26 +136,106 @@ class UserRepository(BaseGuacamoleRepository):
             """,
                 (username, ENTITY_TYPE_USER),
             )
+            entity_id = self.cursor.lastrowid
 
             # Create user with proper binary data
             self.cursor.execute(
                 """
                 INSERT INTO guacamole_user
                     (entity_id, password_hash, password_salt, password_date)
-                SELECT
-                    entity_id,
-                    %s,
-                    %s,
-                    NOW()
-            FROM guacamole_entity
-            WHERE name = %s AND type = %s
+                VALUES (%s, %s, %s, NOW())
             """,
-                (password_hash, password_salt, username, ENTITY_TYPE_USER),
+                (entity_id, password_hash, password_salt),
             )
 
+            return entity_id
+
         except mysql.connector.Error as e:
+            # The unique (type, name) key on guacamole_entity makes the
+            # INSERT itself the existence check
+            if self.is_duplicate_entry(e):
+                raise ValidationError(f"User '{username}' already exists") from e
             raise DatabaseError(f"Error creating user: {e}") from e
 
+    def create_users(self, users: List[Tuple[str, str]]) -> Dict[str, int]:
+        """Create many users with a fixed number of statements per chunk.
+
+        Users are processed in chunks of MAX_ROWS_PER_STATEMENT. For each
+        chunk, entities and users are each inserted with one multi-row
+        INSERT, and the new entity IDs are read back with a single SELECT.
+
+        Args:
+            users: List of (username, password) tuples
+
+        Returns:
+            dict: Mapping of username to the new user's entity ID
+
+        Raises:
+            ValidationError: If a username appears more than once
+            DatabaseError: If database operation fails (e.g. a user exists)
+        """
+        usernames = [username for username, _ in users]
+        if len(set(usernames)) != len(usernames):
+            raise ValidationError("Duplicate usernames in bulk user creation")
+
+        entity_ids: Dict[str, int] = {}
+        try:
+            for start in range(0, len(users), MAX_ROWS_PER_STATEMENT):
+                entity_ids.update(
+                    self._insert_users(users[start : start + MAX_ROWS_PER_STATEMENT])
+                )
+            return entity_ids
+
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error creating users: {e}") from e
+
+    def _insert_users(self, users: List[Tuple[str, str]]) -> Dict[str, int]:
+        """Insert one chunk of users for create_users.
+
+        Args:
+            users: Non-empty list of (username, password) tuples
+
+        Returns:
+            dict: Mapping of username to the new user's entity ID
+        """
+        usernames = [username for username, _ in users]
+
+        # Rows are joined into one VALUES list explicitly rather than via
+        # executemany, which sends one statement per row on a prepared
+        # cursor
+        self.cursor.execute(
+            """
+            INSERT INTO guacamole_entity (name, type)
+            VALUES """ + ", ".join(["(%s, %s)"] * len(usernames)),
+            [value for username in usernames for value in (username, ENTITY_TYPE_USER)],
+        )
+
+        placeholders = ", ".join(["%s"] * len(usernames))
+        self.cursor.execute(
+            f"""
+            SELECT name, entity_id FROM guacamole_entity
+            WHERE type = %s AND name IN ({placeholders})
+        """,
+            (ENTITY_TYPE_USER, *usernames),
+        )
+        entity_ids = dict(self.cursor.fetchall())
+
+        # Salts and hashes are computed client-side, so each row is plain
+        # values and the whole chunk fits in one statement
+        self.cursor.execute(
+            """
+            INSERT INTO guacamole_user
+                (entity_id, password_hash, password_salt, password_date)
+            VALUES """ + ", ".join(["(%s, %s, %s, NOW())"] * len(users)),
+            [
+                value
+                for username, password in users
+                for value in (entity_ids[username], *self._hash_password(password))
+            ],
+        )
+
+        return entity_ids
+
     def delete_existing_user(self, username: str) -> None:
         """Delete a user and all associated data.
 
@@ -117,69 +243,66 @@ class UserRepository(BaseGuacamoleRepository):
             username: Username to delete
         """
         try:
-            if not self.user_exists(username):
+            # Resolve entity_id once; this also serves as the existence check
+            self.cursor.execute(SQL_SELECT_ENTITY_ID, (username, ENTITY_TYPE_USER))
+            result = self.cursor.fetchone()
+            if not result:
                 raise EntityNotFoundError("user", username)
+            entity_id = result[0]
 
-            self.debug_print(f"Deleting user: {username}")
-            # Delete user group permissions first
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_user_group_permission
-                WHERE entity_id IN (
-                    SELECT entity_id FROM guacamole_entity
-                    WHERE name = %s AND type = %s
-                )
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+            self.debug_print("Deleting user: %s (entity ID: %s)", username, entity_id)
+            # Delete dependent rows by primary key instead of re-running
+            # the name lookup as a subquery in every statement
+            for query in SQL_DELETE_USER_BY_ENTITY_ID:
+                self.cursor.execute(query, (entity_id,))
 
-            # Delete user group memberships
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_user_group_member
-                WHERE member_entity_id IN (
-                    SELECT entity_id FROM guacamole_entity
-                    WHERE name = %s AND type = %s
-                )
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error deleting existing user: {e}") from e
 
-            # Delete user permissions
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_connection_permission
-                WHERE entity_id IN (
-                    SELECT entity_id FROM guacamole_entity
-                    WHERE name = %s AND type = %s
-                )
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+    def delete_users(self, usernames: List[str]) -> None:
+        """Delete many users and all their associated data.
 
-            # Delete user
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_user
-                WHERE entity_id IN (
-                    SELECT entity_id FROM guacamole_entity
-                    WHERE name = %s AND type = %s
-                )
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+        Users are processed in chunks of MAX_ROWS_PER_STATEMENT. Each chunk
+        resolves its entity IDs with one SELECT and deletes from every table
+        with one DELETE ... IN statement.
 
-            # Delete entity
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_entity
-                WHERE name = %s AND type = %s
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+        Args:
+            usernames: Usernames to delete
+
+        Raises:
+            EntityNotFoundError: If a user does not exist; nothing is deleted
+                from the chunk containing it
+            DatabaseError: If database operation fails
+        """
+        names = list(dict.fromkeys(usernames))
+        try:
+            for start in range(0, len(names), MAX_ROWS_PER_STATEMENT):
+                chunk = names[start : start + MAX_ROWS_PER_STATEMENT]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                self.cursor.execute(
+                    f"""
+                    SELECT name, entity_id FROM guacamole_entity
+                    WHERE type = %s AND name IN ({placeholders})
+                """,
+                    (ENTITY_TYPE_USER, *chunk),
+                )
+                entity_ids = self.match_names(chunk, self.cursor.fetchall())
+                for username in chunk:
+                    if username not in entity_ids:
+                        raise EntityNotFoundError("user", username)
+
+                self.debug_print("Deleting users: %s", chunk)
+                # Names differing only in case resolve to the same user
+                ids = list(dict.fromkeys(entity_ids.values()))
+                id_placeholders = ", ".join(["%s"] * len(ids))
+                for table, column in USER_ROW_TABLES:
+                    self.cursor.execute(
+                        f"DELETE FROM {table} WHERE {column} IN ({id_placeholders})",
+                        ids,
+                    )
 
         except mysql.connector.Error as e:
-            raise DatabaseError(f"Error deleting existing user: {e}") from e
+            raise DatabaseError(f"Error deleting users: {e}") from e
 
     def change_user_password(self, username: str, new_password: str) -> bool:
         """Change a user's password.
@@ -192,23 +315,10 @@ class UserRepository(BaseGuacamoleRepository):
             bool: True if successful
         """
         try:
-            # Generate random 32-byte salt
-            salt = os.urandom(32)
-
-            # Convert salt to uppercase hex string as Guacamole expects
-            salt_hex = binascii.hexlify(salt).upper()
-
-            # Create password hash using Guacamole's method: SHA256(password + hex(salt))
-            digest = hashlib.sha256(new_password.encode("utf-8") + salt_hex).digest()
+            digest, salt = self._hash_password(new_password)
 
             # Get user entity_id
-            self.cursor.execute(
-                """
-                SELECT entity_id FROM guacamole_entity
-                WHERE name = %s AND type = %s
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+            self.cursor.execute(SQL_SELECT_ENTITY_ID, (username, ENTITY_TYPE_USER))
             result = self.cursor.fetchone()
             if not result:
                 raise EntityNotFoundError("user", username)
@@ -279,13 +389,7 @@ class UserRepository(BaseGuacamoleRepository):
                     )
 
             # Get user entity_id
-            self.cursor.execute(
-                """
-                SELECT entity_id FROM guacamole_entity
-                WHERE name = %s AND type = %s
-            """,
-                (username, ENTITY_TYPE_USER),
-            )
+            self.cursor.execute(SQL_SELECT_ENTITY_ID, (username, ENTITY_TYPE_USER))
             result = self.cursor.fetchone()
             if not result:
                 raise EntityNotFoundError("user", username)
@@ -310,37 +414,53 @@ class UserRepository(BaseGuacamoleRepository):
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error modifying user parameter: {e}") from e
 
-    def list_users_with_usergroups(self) -> Dict[str, List[str]]:
-        """List all users with their group memberships.
+    def list_users_with_usergroups(
+        self, names: Optional[List[str]] = None
+    ) -> Dict[str, List[str]]:
+        """List users with their group memberships.
+
+        Args:
+            names: Only list these users (optional, default all users)
 
         Returns:
             dict: Dictionary mapping usernames to list of group names
         """
-        try:
-            query = """
-                SELECT DISTINCT
-                    e1.name as username,
-                    GROUP_CONCAT(e2.name) as groupnames
-                FROM guacamole_entity e1
-                JOIN guacamole_user u ON e1.entity_id = u.entity_id
-                LEFT JOIN guacamole_user_group_member ugm
-                    ON e1.entity_id = ugm.member_entity_id
-                LEFT JOIN guacamole_user_group ug
-                    ON ugm.user_group_id = ug.user_group_id
-                LEFT JOIN guacamole_entity e2
-                    ON ug.entity_id = e2.entity_id
-                WHERE e1.type = %s
-                GROUP BY e1.name
-            """
-            self.cursor.execute(query, (ENTITY_TYPE_USER,))
-            results = self.cursor.fetchall()
+        if names is not None and not names:
+            return {}
 
-            users_groups: Dict[str, List[str]] = {}
-            for row in results:
-                username = row[0]
-                groupnames = row[1].split(",") if row[1] else []
-                users_groups[username] = groupnames
+        user_filter = member_filter = ""
+        name_params: Tuple[str, ...] = ()
+        if names is not None:
+            name_params = tuple(dict.fromkeys(names))
+            placeholders = ", ".join(["%s"] * len(name_params))
+            user_filter = f"AND e.name IN ({placeholders})"
+            member_filter = f"AND ue.name IN ({placeholders})"
 
-            return users_groups
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT e.name
+                FROM guacamole_entity e
+                JOIN guacamole_user u ON e.entity_id = u.entity_id
+                WHERE e.type = %s {user_filter}
+                ORDER BY e.name
+            """,
+                (ENTITY_TYPE_USER, *name_params),
+            )
+            usernames = [row[0] for row in self.cursor.fetchall()]
+
+            self.cursor.execute(
+                f"""
+                SELECT ue.name, ge.name
+                FROM guacamole_user_group_member ugm
+                JOIN guacamole_entity ue ON ugm.member_entity_id = ue.entity_id
+                JOIN guacamole_user_group ug ON ugm.user_group_id = ug.user_group_id
+                JOIN guacamole_entity ge ON ug.entity_id = ge.entity_id
+                WHERE ue.type = %s {member_filter}
+                ORDER BY ge.name
+            """,
+                (ENTITY_TYPE_USER, *name_params),
+            )
+            return self.group_rows(usernames, self.cursor.fetchall())
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error listing users with usergroups: {e}") from e
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """User group repository for Guacamole database operations."""
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import mysql.connector
 
@@ -9,29 +9,75 @@ from .base import BaseGuacamoleRepository
 from ..entities import ENTITY_TYPE_USER, ENTITY_TYPE_USER_GROUP
 from ..exceptions import DatabaseError, EntityNotFoundError, ValidationError
 
+# Add a user to a group, resolving both names inside the statement. Inserts
+# nothing when either the user or the group does not exist. Takes (username,
+# user type, group name, group type); parameters are positional because
+# prepared cursors rewrite dict-parameter SQL on every call and so
+# re-prepare it each time.
+SQL_INSERT_MEMBER_BY_NAME = """
+    INSERT INTO guacamole_user_group_member (user_group_id, member_entity_id)
+    SELECT g.user_group_id, u.entity_id
+    FROM guacamole_user_group g
+    JOIN guacamole_entity ge ON ge.entity_id = g.entity_id
+    JOIN guacamole_entity u ON u.name = %s AND u.type = %s
+    WHERE ge.name = %s AND ge.type = %s
+"""
+
+# Grant the user READ permission on the group unless it already has it. An
+# existing grant hits the table's primary key and is left unchanged, so no
+# anti-join against the permission table is needed. Takes the same
+# parameters as SQL_INSERT_MEMBER_BY_NAME.
+SQL_INSERT_GROUP_PERMISSION_BY_NAME = """
+    INSERT INTO guacamole_user_group_permission
+    (entity_id, affected_user_group_id, permission)
+    SELECT u.entity_id, g.user_group_id, 'READ'
+    FROM guacamole_user_group g
+    JOIN guacamole_entity ge ON ge.entity_id = g.entity_id
+    JOIN guacamole_entity u ON u.name = %s AND u.type = %s
+    WHERE ge.name = %s AND ge.type = %s
+    ON DUPLICATE KEY UPDATE permission = permission
+"""
+
 
 class UserGroupRepository(BaseGuacamoleRepository):
     """Repository for user group-related database operations."""
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the repository, see BaseGuacamoleRepository."""
+        super().__init__(*args, **kwargs)
+        # Group IDs already resolved by name on this connection. Entries are
+        # dropped when the group is deleted through this repository.
+        self._usergroup_ids: Dict[str, int] = {}
+
     def list_usergroups(self) -> List[str]:
         """List all user groups.
 
         Returns:
             list: List of group names
         """
-        try:
-            self.cursor.execute(
-                """
-                SELECT name
-                FROM guacamole_entity
-                WHERE type = %s
-                ORDER BY name
-            """,
-                (ENTITY_TYPE_USER_GROUP,),
-            )
-            return [row[0] for row in self.cursor.fetchall()]
-        except mysql.connector.Error as e:
-            raise DatabaseError(f"Error listing usergroups: {e}") from e
+        return list(self.iter_usergroups())
+
+    def iter_usergroups(self) -> Iterator[str]:
+        """Iterate over all user group names without loading them all at once.
+
+        Yields:
+            str: Group names in alphabetical order
+        """
+        for row in self._iter_rows(
+            """
+            SELECT name
+            FROM guacamole_entity
+            WHERE type = %s
+            ORDER BY name
+        """,
+            (ENTITY_TYPE_USER_GROUP,),
+            "listing usergroups",
+        ):
+            yield row[0]
+
+    def clear_id_cache(self) -> None:
+        """Forget the group IDs resolved by name so far."""
+        self._usergroup_ids.clear()
 
     def usergroup_exists(self, group_name: str) -> bool:
         """Check if a group with the given name exists.
@@ -89,6 +135,9 @@ class UserGroupRepository(BaseGuacamoleRepository):
         Raises:
             EntityNotFoundError: If group not found
         """
+        if group_name in self._usergroup_ids:
+            return self._usergroup_ids[group_name]
+
         try:
             self.cursor.execute(
                 """
@@ -101,6 +150,7 @@ class UserGroupRepository(BaseGuacamoleRepository):
             )
             result = self.cursor.fetchone()
             if result:
+                self._usergroup_ids[group_name] = result[0]
                 return result[0]
             else:
                 raise EntityNotFoundError("usergroup", group_name)
@@ -172,11 +222,18 @@ class UserGroupRepository(BaseGuacamoleRepository):
             name_query=name_query,
         )
 
-    def create_usergroup(self, group_name: str) -> None:
+    def create_usergroup(self, group_name: str) -> int:
         """Create a new user group.
 
         Args:
             group_name: Name for the new group
+
+        Returns:
+            int: Entity ID of the new group
+
+        Raises:
+            ValidationError: If a user group with this name already exists
+            DatabaseError: If database operation fails
         """
         try:
             # Create entity
@@ -187,19 +244,24 @@ class UserGroupRepository(BaseGuacamoleRepository):
             """,
                 (group_name, ENTITY_TYPE_USER_GROUP),
             )
+            entity_id = self.cursor.lastrowid
 
             # Create group
             self.cursor.execute(
                 """
                 INSERT INTO guacamole_user_group (entity_id, disabled)
-                SELECT entity_id, FALSE
-                FROM guacamole_entity
-                WHERE name = %s AND type = %s
+                VALUES (%s, FALSE)
             """,
-                (group_name, ENTITY_TYPE_USER_GROUP),
+                (entity_id,),
             )
 
+            return entity_id
+
         except mysql.connector.Error as e:
+            # The unique (type, name) key on guacamole_entity makes the
+            # INSERT itself the existence check
+            if self.is_duplicate_entry(e):
+                raise ValidationError(f"Usergroup '{group_name}' already exists") from e
             raise DatabaseError(f"Error creating usergroup: {e}") from e
 
     def delete_existing_usergroup(self, group_name: str) -> None:
@@ -207,56 +269,32 @@ class UserGroupRepository(BaseGuacamoleRepository):
 
         Args:
             group_name: Group name to delete
+
+        Raises:
+            EntityNotFoundError: If the group does not exist
+            DatabaseError: If database operation fails
         """
         try:
-            self.debug_print(f"Deleting usergroup: {group_name}")
-            # Delete group memberships
+            # Resolve both IDs once; this also serves as the existence check,
+            # so nothing is deleted when the group does not exist
             self.cursor.execute(
                 """
-                DELETE FROM guacamole_user_group_member
-                WHERE user_group_id IN (
-                    SELECT user_group_id FROM guacamole_user_group
-                    WHERE entity_id IN (
-                        SELECT entity_id FROM guacamole_entity
-                        WHERE name = %s AND type = %s
-                    )
-                )
-            """,
-                (group_name, ENTITY_TYPE_USER_GROUP),
-            )
-
-            # Delete group permissions
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_connection_permission
-                WHERE entity_id IN (
-                    SELECT entity_id FROM guacamole_entity
-                    WHERE name = %s AND type = %s
-                )
-            """,
-                (group_name, ENTITY_TYPE_USER_GROUP),
-            )
-
-            # Delete user group
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_user_group
-                WHERE entity_id IN (
-                    SELECT entity_id FROM guacamole_entity
-                    WHERE name = %s AND type = %s
-                )
+                SELECT ug.user_group_id, e.entity_id
+                FROM guacamole_entity e
+                JOIN guacamole_user_group ug ON ug.entity_id = e.entity_id
+                WHERE e.name = %s AND e.type = %s
             """,
                 (group_name, ENTITY_TYPE_USER_GROUP),
             )
+            result = self.cursor.fetchone()
+            if not result:
+                raise EntityNotFoundError("usergroup", group_name)
+            user_group_id, entity_id = result
 
-            # Delete entity
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_entity
-                WHERE name = %s AND type = %s
-            """,
-                (group_name, ENTITY_TYPE_USER_GROUP),
+            self.debug_print(
+                "Deleting usergroup: %s (ID: %s)", group_name, user_group_id
             )
+            self._delete_usergroup_rows(user_group_id, entity_id)
 
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error deleting existing usergroup: {e}") from e
@@ -266,119 +304,252 @@ class UserGroupRepository(BaseGuacamoleRepository):
 
         Args:
             group_id: Group ID to delete
-        """
-        try:
-            # Validate and resolve the group ID
-            resolved_group_id = self.resolve_usergroup_id(group_id=group_id)
-            group_name = self.get_usergroup_name_by_id(resolved_group_id)
 
-            self.debug_print(
-                f"Attempting to delete usergroup: {group_name} (ID: {resolved_group_id})"
-            )
-
-            # Delete group memberships
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_user_group_member
-                WHERE user_group_id = %s
-            """,
-                (resolved_group_id,),
-            )
-
-            # Delete group permissions
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_connection_permission
-                WHERE entity_id IN (
-                    SELECT entity_id FROM guacamole_user_group
-                    WHERE user_group_id = %s
-                )
-            """,
-                (resolved_group_id,),
-            )
+        Raises:
+            ValidationError: If the ID is not a positive integer
+            EntityNotFoundError: If the group does not exist
+            DatabaseError: If database operation fails
+        """
+        self.validate_positive_id(group_id, "Usergroup")
 
-            # Delete user group
+        try:
+            # Resolve the entity ID and name once; this also serves as the
+            # existence check
             self.cursor.execute(
                 """
-                DELETE FROM guacamole_user_group
-                WHERE user_group_id = %s
+                SELECT ug.entity_id, e.name
+                FROM guacamole_user_group ug
+                JOIN guacamole_entity e ON ug.entity_id = e.entity_id
+                WHERE ug.user_group_id = %s
             """,
-                (resolved_group_id,),
+                (group_id,),
             )
+            result = self.cursor.fetchone()
+            if not result:
+                raise EntityNotFoundError("usergroup", str(group_id))
+            entity_id, group_name = result
 
-            # Delete entity
-            self.cursor.execute(
-                """
-                DELETE FROM guacamole_entity
-                WHERE entity_id IN (
-                    SELECT entity_id FROM guacamole_user_group
-                    WHERE user_group_id = %s
-                )
-            """,
-                (resolved_group_id,),
+            self.debug_print(
+                "Attempting to delete usergroup: %s (ID: %s)", group_name, group_id
             )
+            self._delete_usergroup_rows(group_id, entity_id)
 
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error deleting existing usergroup: {e}") from e
 
+    def _delete_usergroup_rows(self, user_group_id: int, entity_id: int) -> None:
+        """Delete a user group and its dependent rows by primary key.
+
+        Args:
+            user_group_id: Group ID
+            entity_id: Entity ID of the group
+        """
+        self._usergroup_ids = {
+            name: group_id
+            for name, group_id in self._usergroup_ids.items()
+            if group_id != user_group_id
+        }
+
+        # Delete group memberships
+        self.cursor.execute(
+            """
+            DELETE FROM guacamole_user_group_member
+            WHERE user_group_id = %s
+        """,
+            (user_group_id,),
+        )
+
+        # Delete group permissions
+        self.cursor.execute(
+            """
+            DELETE FROM guacamole_connection_permission
+            WHERE entity_id = %s
+        """,
+            (entity_id,),
+        )
+
+        # Delete user group
+        self.cursor.execute(
+            """
+            DELETE FROM guacamole_user_group
+            WHERE user_group_id = %s
+        """,
+            (user_group_id,),
+        )
+
+        # Delete entity
+        self.cursor.execute(
+            """
+            DELETE FROM guacamole_entity
+            WHERE entity_id = %s
+        """,
+            (entity_id,),
+        )
+
     def add_user_to_usergroup(self, username: str, group_name: str) -> None:
         """Add a user to a user group.
 
         Args:
             username: Username to add
             group_name: Group name to add user to
+
+        Raises:
+            EntityNotFoundError: If the user or the group does not exist
+            DatabaseError: If database operation fails
+        """
+        params = (username, ENTITY_TYPE_USER, group_name, ENTITY_TYPE_USER_GROUP)
+        try:
+            self.cursor.execute(SQL_INSERT_MEMBER_BY_NAME, params)
+            if self.cursor.rowcount == 0:
+                # Nothing matched; find out which side is missing
+                self.get_usergroup_id(group_name)
+                raise EntityNotFoundError("user", username)
+
+            self.cursor.execute(SQL_INSERT_GROUP_PERMISSION_BY_NAME, params)
+
+            self.debug_print(
+                "Successfully added user '%s' to usergroup '%s'", username, group_name
+            )
+
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error adding user to usergroup: {e}") from e
+
+    def add_user_to_usergroup_by_entity_id(
+        self, user_entity_id: int, group_name: str
+    ) -> None:
+        """Add a user whose entity ID is already known to a user group.
+
+        Unlike add_user_to_usergroup, this does not look the user up by
+        name, e.g. right after the user was created.
+
+        Args:
+            user_entity_id: Entity ID of the user
+            group_name: Group name to add user to
+
+        Raises:
+            EntityNotFoundError: If the group does not exist
+            DatabaseError: If database operation fails
         """
         try:
-            # Get the group ID
             group_id = self.get_usergroup_id(group_name)
+            self._add_member(group_id, user_entity_id)
 
-            # Get the user's entity ID
-            self.cursor.execute(
-                """
-                SELECT entity_id
-                FROM guacamole_entity
-                WHERE name = %s AND type = %s
-            """,
-                (username, ENTITY_TYPE_USER),
+            self.debug_print(
+                "Added user entity ID %s to usergroup '%s'", user_entity_id, group_name
             )
-            result = self.cursor.fetchone()
-            if not result:
-                raise EntityNotFoundError("user", username)
-            user_entity_id = result[0]
 
-            # Add user to group
+        except mysql.connector.Error as e:
+            raise DatabaseError(f"Error adding user to usergroup: {e}") from e
+
+    def add_user_to_usergroups_by_entity_id(
+        self, user_entity_id: int, group_names: List[str]
+    ) -> List[str]:
+        """Add a user whose entity ID is already known to several user groups.
+
+        Groups not resolved earlier on this connection are looked up with
+        one SELECT, and the memberships and permissions are each added with
+        one statement. Groups that do not exist are skipped and returned.
+
+        Args:
+            user_entity_id: Entity ID of the user
+            group_names: Group names to add user to
+
+        Returns:
+            list: Group names that do not exist, in the given order
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        names = list(dict.fromkeys(group_names))
+        if not names:
+            return []
+
+        group_ids = {
+            name: self._usergroup_ids[name]
+            for name in names
+            if name in self._usergroup_ids
+        }
+        unresolved = [name for name in names if name not in group_ids]
+        try:
+            if unresolved:
+                placeholders = ", ".join(["%s"] * len(unresolved))
+                self.cursor.execute(
+                    f"""
+                    SELECT e.name, g.user_group_id
+                    FROM guacamole_user_group g
+                    JOIN guacamole_entity e ON g.entity_id = e.entity_id
+                    WHERE e.type = %s AND e.name IN ({placeholders})
+                """,
+                    (ENTITY_TYPE_USER_GROUP, *unresolved),
+                )
+                fetched = self.match_names(unresolved, self.cursor.fetchall())
+                self._usergroup_ids.update(fetched)
+                group_ids.update(fetched)
+
+            missing = [name for name in names if name not in group_ids]
+            if not group_ids:
+                return missing
+
+            # Names differing only in case resolve to the same group
+            ids = list(dict.fromkeys(group_ids.values()))
             self.cursor.execute(
                 """
                 INSERT INTO guacamole_user_group_member
                 (user_group_id, member_entity_id)
-                VALUES (%s, %s)
-            """,
-                (group_id, user_entity_id),
+                VALUES """ + ", ".join(["(%s, %s)"] * len(ids)),
+                [value for group_id in ids for value in (group_id, user_entity_id)],
             )
 
-            # Grant group permissions to user
+            id_placeholders = ", ".join(["%s"] * len(ids))
             self.cursor.execute(
-                """
+                f"""
                 INSERT INTO guacamole_user_group_permission
                 (entity_id, affected_user_group_id, permission)
-                SELECT %s, %s, 'READ'
-                FROM dual
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM guacamole_user_group_permission
-                    WHERE entity_id = %s
-                    AND affected_user_group_id = %s
-                    AND permission = 'READ'
-                )
+                SELECT %s, g.user_group_id, 'READ'
+                FROM guacamole_user_group g
+                WHERE g.user_group_id IN ({id_placeholders})
+                ON DUPLICATE KEY UPDATE permission = permission
             """,
-                (user_entity_id, group_id, user_entity_id, group_id),
+                (user_entity_id, *ids),
             )
 
             self.debug_print(
-                f"Successfully added user '{username}' to usergroup '{group_name}'"
+                "Added user entity ID %s to usergroups: %s",
+                user_entity_id,
+                list(group_ids),
             )
+            return missing
 
         except mysql.connector.Error as e:
-            raise DatabaseError(f"Error adding user to usergroup: {e}") from e
+            raise DatabaseError(f"Error adding user to usergroups: {e}") from e
+
+    def _add_member(self, group_id: int, user_entity_id: int) -> None:
+        """Insert a group membership and the matching READ permission.
+
+        Args:
+            group_id: Group ID
+            user_entity_id: Entity ID of the user
+        """
+        # Add user to group
+        self.cursor.execute(
+            """
+            INSERT INTO guacamole_user_group_member
+            (user_group_id, member_entity_id)
+            VALUES (%s, %s)
+        """,
+            (group_id, user_entity_id),
+        )
+
+        # Grant group permissions to user; an existing grant is left as is
+        self.cursor.execute(
+            """
+            INSERT INTO guacamole_user_group_permission
+            (entity_id, affected_user_group_id, permission)
+            VALUES (%s, %s, 'READ')
+            ON DUPLICATE KEY UPDATE permission = permission
+        """,
+            (user_entity_id, group_id),
+        )
 
     def remove_user_from_usergroup(self, username: str, group_name: str) -> None:
         """Remove a user from a user group.
@@ -438,41 +609,60 @@ class UserGroupRepository(BaseGuacamoleRepository):
             )
 
             self.debug_print(
-                f"Successfully removed user '{username}' from usergroup '{group_name}'"
+                "Successfully removed user '%s' from usergroup '%s'",
+                username,
+                group_name,
             )
 
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error removing user from group: {e}") from e
 
-    def list_groups_with_users(self) -> Dict[str, List[str]]:
-        """List all groups with their users.
+    def list_groups_with_users(
+        self, names: Optional[List[str]] = None
+    ) -> Dict[str, List[str]]:
+        """List groups with their users.
+
+        Args:
+            names: Only list these groups (optional, default all groups)
 
         Returns:
             dict: Dictionary mapping group names to list of usernames
         """
-        try:
-            query = """
-                SELECT
-                    e.name as groupname,
-                    GROUP_CONCAT(DISTINCT ue.name) as usernames
-                FROM guacamole_entity e
-                LEFT JOIN guacamole_user_group ug ON e.entity_id = ug.entity_id
-                LEFT JOIN guacamole_user_group_member ugm ON ug.user_group_id = ugm.user_group_id
-                LEFT JOIN guacamole_entity ue ON ugm.member_entity_id = ue.entity_id AND ue.type = %s
-                WHERE e.type = %s
-                GROUP BY e.name
-                ORDER BY e.name
-            """
-            self.cursor.execute(query, (ENTITY_TYPE_USER, ENTITY_TYPE_USER_GROUP))
-            results = self.cursor.fetchall()
+        if names is not None and not names:
+            return {}
 
-            groups_users: Dict[str, List[str]] = {}
-            for row in results:
-                groupname = row[0]
-                usernames = row[1].split(",") if row[1] else []
-                groups_users[groupname] = usernames
+        group_filter = member_filter = ""
+        name_params: Tuple[str, ...] = ()
+        if names is not None:
+            name_params = tuple(dict.fromkeys(names))
+            placeholders = ", ".join(["%s"] * len(name_params))
+            group_filter = f"AND name IN ({placeholders})"
+            member_filter = f"AND ge.name IN ({placeholders})"
 
-            return groups_users
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT name FROM guacamole_entity
+                WHERE type = %s {group_filter}
+                ORDER BY name
+            """,
+                (ENTITY_TYPE_USER_GROUP, *name_params),
+            )
+            groupnames = [row[0] for row in self.cursor.fetchall()]
+
+            self.cursor.execute(
+                f"""
+                SELECT ge.name, ue.name
+                FROM guacamole_user_group_member ugm
+                JOIN guacamole_user_group ug ON ugm.user_group_id = ug.user_group_id
+                JOIN guacamole_entity ge ON ug.entity_id = ge.entity_id
+                JOIN guacamole_entity ue ON ugm.member_entity_id = ue.entity_id
+                WHERE ue.type = %s {member_filter}
+                ORDER BY ue.name
+            """,
+                (ENTITY_TYPE_USER, *name_params),
+            )
+            return self.group_rows(groupnames, self.cursor.fetchall())
         except mysql.connector.Error as e:
             raise DatabaseError(f"Error listing groups with users: {e}") from e
 
@@ -485,58 +675,53 @@ class UserGroupRepository(BaseGuacamoleRepository):
             dict: Dictionary with group info including id, users, and connections
         """
         try:
-            # Get users per group with IDs
             self.cursor.execute(
                 """
-                SELECT
-                    e.name as groupname,
-                    ug.user_group_id,
-                    GROUP_CONCAT(DISTINCT ue.name) as users
+                SELECT e.name, ug.user_group_id
                 FROM guacamole_entity e
                 LEFT JOIN guacamole_user_group ug ON e.entity_id = ug.entity_id
-                LEFT JOIN guacamole_user_group_member ugm ON ug.user_group_id = ugm.user_group_id
-                LEFT JOIN guacamole_entity ue ON ugm.member_entity_id = ue.entity_id AND ue.type = %s
                 WHERE e.type = %s
-                GROUP BY e.name, ug.user_group_id
+                ORDER BY e.name
+            """,
+                (ENTITY_TYPE_USER_GROUP,),
+            )
+            group_ids = dict(self.cursor.fetchall())
+
+            self.cursor.execute(
+                """
+                SELECT DISTINCT ge.name, ue.name
+                FROM guacamole_user_group_member ugm
+                JOIN guacamole_user_group ug ON ugm.user_group_id = ug.user_group_id
+                JOIN guacamole_entity ge ON ug.entity_id = ge.entity_id
+                JOIN guacamole_entity ue ON ugm.member_entity_id = ue.entity_id
+                WHERE ue.type = %s AND ge.type = %s
+                ORDER BY ue.name
             """,
                 (ENTITY_TYPE_USER, ENTITY_TYPE_USER_GROUP),
             )
-            groups_users = {
-                (row[0], row[1]): row[2].split(",") if row[2] else []
-                for row in self.cursor.fetchall()
-            }
+            groups_users = self.group_rows(group_ids, self.cursor.fetchall())
 
-            # Get connections per group with IDs
             self.cursor.execute(
                 """
-                SELECT
-                    e.name as groupname,
-                    ug.user_group_id,
-                    GROUP_CONCAT(DISTINCT c.connection_name) as connections
-                FROM guacamole_entity e
-                LEFT JOIN guacamole_user_group ug ON e.entity_id = ug.entity_id
-                LEFT JOIN guacamole_connection_permission cp ON e.entity_id = cp.entity_id
-                LEFT JOIN guacamole_connection c ON cp.connection_id = c.connection_id
+                SELECT DISTINCT e.name, c.connection_name
+                FROM guacamole_connection_permission cp
+                JOIN guacamole_entity e ON cp.entity_id = e.entity_id
+                JOIN guacamole_connection c ON cp.connection_id = c.connection_id
                 WHERE e.type = %s
-                GROUP BY e.name, ug.user_group_id
+                ORDER BY c.connection_name
             """,
                 (ENTITY_TYPE_USER_GROUP,),
             )
-            groups_connections = {
-                (row[0], row[1]): row[2].split(",") if row[2] else []
-                for row in self.cursor.fetchall()
-            }
+            groups_connections = self.group_rows(group_ids, self.cursor.fetchall())
 
-            # Combine results
-            result: Dict[str, Dict[str, object]] = {}
-            for group_key in set(groups_users.keys()).union(groups_connections.keys()):
-                group_name, group_id = group_key
-                result[group_name] = {
+            return {
+                group_name: {
                     "id": group_id,
-                    "users": groups_users.get(group_key, []),
-                    "connections": groups_connections.get(group_key, []),
+                    "users": groups_users[group_name],
+                    "connections": groups_connections[group_name],
                 }
-            return result
+                for group_name, group_id in group_ids.items()
+            }
         except mysql.connector.Error as e:
             raise DatabaseError(
                 f"Error listing groups with users and connections: {e}"
@@ -25,6 +25,8 @@ declare -a TEST_FILES=(
     "tests/test_conngroup_permit_deny.bats"
     "tests/test_ids_feature.bats"
     "tests/test_dump.bats"
+    "tests/test_batch.bats"
+    "tests/test_transaction.bats"
 )
 
 # Function to count tests in a file
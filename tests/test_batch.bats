@@ -0,0 +1,97 @@
+#!/usr/bin/env bats
+
+# Load the main test runner which includes setup/teardown and helper functions
+load run_tests.bats
+
+@test "Batch runs all commands from file" {
+    TIMESTAMP=$(date +%s)
+    GROUP="test_batch_group_$TIMESTAMP"
+    USER="test_batch_user_$TIMESTAMP"
+    BATCH_FILE=$(mktemp)
+
+    cat > "$BATCH_FILE" <<BATCH
+# Comments and empty lines are ignored
+
+usergroup new --name $GROUP
+user new --name $USER --password testpass --usergroup $GROUP
+user exists --name $USER
+BATCH
+
+    run guacaman --config "$TEST_CONFIG" batch --file "$BATCH_FILE"
+    rm -f "$BATCH_FILE"
+    [ "$status" -eq 0 ]
+
+    run guacaman --config "$TEST_CONFIG" user list
+    [ "$status" -eq 0 ]
+    echo "$output" | grep -A 3 "$USER:" | grep -q "$GROUP"
+
+    guacaman --config "$TEST_CONFIG" user del --name "$USER"
+    guacaman --config "$TEST_CONFIG" usergroup del --name "$GROUP"
+}
+
+@test "Batch creates and modifies a connection" {
+    TIMESTAMP=$(date +%s)
+    CONN="test_batch_conn_$TIMESTAMP"
+    BATCH_FILE=$(mktemp)
+
+    cat > "$BATCH_FILE" <<BATCH
+conn new --name $CONN --type vnc --hostname 192.168.1.150 --port 5901 --password vncpass
+conn modify --name $CONN --set port=5902
+conn modify --name $CONN --set hostname=10.1.1.50
+BATCH
+
+    run guacaman --config "$TEST_CONFIG" batch --file "$BATCH_FILE"
+    rm -f "$BATCH_FILE"
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"Successfully updated port"* ]]
+    [[ "$output" == *"Successfully updated hostname"* ]]
+
+    run guacaman --config "$TEST_CONFIG" conn list
+    [ "$status" -eq 0 ]
+    echo "$output" | grep -A 5 "$CONN:" | grep -q "port: 5902"
+    echo "$output" | grep -A 5 "$CONN:" | grep -q "hostname: 10.1.1.50"
+
+    guacaman --config "$TEST_CONFIG" conn del --name "$CONN"
+}
+
+@test "Batch rolls back all commands when one fails" {
+    TIMESTAMP=$(date +%s)
+    USER="test_batch_rollback_$TIMESTAMP"
+    BATCH_FILE=$(mktemp)
+
+    cat > "$BATCH_FILE" <<BATCH
+user new --name $USER --password testpass
+user new --name $USER --password testpass
+BATCH
+
+    run guacaman --config "$TEST_CONFIG" batch --file "$BATCH_FILE"
+    rm -f "$BATCH_FILE"
+    [ "$status" -ne 0 ]
+    [[ "$output" == *"line 2"* ]]
+
+    run guacaman --config "$TEST_CONFIG" user exists --name "$USER"
+    [ "$status" -eq 1 ]
+}
+
+@test "Batch reads commands from standard input" {
+    TIMESTAMP=$(date +%s)
+    USER="test_batch_stdin_$TIMESTAMP"
+    BATCH_FILE=$(mktemp)
+
+    echo "user new --name $USER --password testpass" > "$BATCH_FILE"
+
+    run guacaman --config "$TEST_CONFIG" batch --file - < "$BATCH_FILE"
+    rm -f "$BATCH_FILE"
+    [ "$status" -eq 0 ]
+
+    run guacaman --config "$TEST_CONFIG" user exists --name "$USER"
+    [ "$status" -eq 0 ]
+
+    guacaman --config "$TEST_CONFIG" user del --name "$USER"
+}
+
+@test "Batch fails on missing file" {
+    run guacaman --config "$TEST_CONFIG" batch --file /nonexistent/batch.txt
+    [ "$status" -eq 1 ]
+    [[ "$output" == *"Cannot read batch file"* ]]
+}
@@ -0,0 +1,48 @@
+#!/usr/bin/env bats
+
+# Library-level savepoint tests, run with server-side prepared statements
+
+load run_tests.bats
+
+@test "transaction() commits its work with prepared statements" {
+    USER="test_tx_commit_$(date +%s)"
+
+    python3 -c "
+from guacalib import GuacamoleDB
+with GuacamoleDB('$TEST_CONFIG', prepared=True) as guacdb:
+    with guacdb.transaction():
+        guacdb.create_user('$USER', 'testpass')
+print('OK')
+" | grep -q "OK"
+
+    run guacaman --config "$TEST_CONFIG" user exists --name "$USER"
+    [ "$status" -eq 0 ]
+
+    guacaman --config "$TEST_CONFIG" user del --name "$USER"
+}
+
+@test "transaction() rolls back only its own work with prepared statements" {
+    TIMESTAMP=$(date +%s)
+    KEPT="test_tx_kept_$TIMESTAMP"
+    UNDONE="test_tx_undone_$TIMESTAMP"
+
+    python3 -c "
+from guacalib import GuacamoleDB
+with GuacamoleDB('$TEST_CONFIG', prepared=True) as guacdb:
+    guacdb.create_user('$KEPT', 'testpass')
+    try:
+        with guacdb.transaction():
+            guacdb.create_user('$UNDONE', 'testpass')
+            raise RuntimeError('undo')
+    except RuntimeError:
+        pass
+print('OK')
+" | grep -q "OK"
+
+    run guacaman --config "$TEST_CONFIG" user exists --name "$KEPT"
+    [ "$status" -eq 0 ]
+    run guacaman --config "$TEST_CONFIG" user exists --name "$UNDONE"
+    [ "$status" -eq 1 ]
+
+    guacaman --config "$TEST_CONFIG" user del --name "$KEPT"
+}